@@ -1,13 +1,25 @@
 # app/api/dream_routes.py
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, status
+import asyncio # STT와 DB 작업 중첩 실행에 사용
+import hashlib # ETag 계산에 사용
+import json # SSE 이벤트 직렬화에 사용
+import tempfile # 업로드 파일 스트리밍을 위한 스풀 파일
+from fastapi import APIRouter, BackgroundTasks, File, UploadFile, HTTPException, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse # SSE 스트리밍 응답
 from sqlalchemy.ext.asyncio import AsyncSession # 비동기 DB 세션 타입
-from sqlalchemy import select # DB 쿼리를 위해 필요
+from sqlalchemy import bindparam, cast, func, select, update # DB 쿼리를 위해 필요
+from sqlalchemy.dialects.postgresql import JSONB # Postgres 원자적 JSON append에 사용
 from typing import List, Dict, Any
 
 # 내부 모듈 임포트
-from ..schemas.dream_schema import DreamAnalysisResponse, DreamSessionResponse, IrtAnalysisResponse
+from ..schemas.dream_schema import (
+    AnalysisJobAcceptedResponse,
+    DreamSessionResponse,
+    DREAM_RESULT_ADAPTER, # 쓰기 경로에서 분석 결과 구조 검증
+    IRT_RESULT_ADAPTER, # 쓰기 경로에서 IRT 결과 구조 검증
+)
 from ..piplines.dream_pipeline import DreamPipeline # 파이프라인
 from ..database.session import get_db # DB 세션 의존성 주입 함수
+from ..database.connection import AsyncSessionLocal # 백그라운드 작업 전용 세션 생성
 from ..core.dependencies import get_dream_pipeline # 파이프라인 의존성 주입 함수
 from ..models.dream_model import DreamSession as DBDreamSession # DB 모델 임포트
 from ..utils.logger import get_logger # 로깅
@@ -16,6 +28,41 @@ from ..utils.exceptions import NotFoundException, BadRequestException, ServiceEx
 router = APIRouter()
 logger = get_logger(__name__)
 
+# ----------------------------------------------------
+# 모듈 레벨에서 한 번만 구성하는 SELECT 구문들
+# 요청마다 select(...) 객체를 다시 만들면 파이썬 할당 비용이 반복되므로,
+# bindparam으로 한 번 구성해 두고 실행 시 파라미터만 바인딩합니다.
+# ----------------------------------------------------
+_SESSION_VERSION_STMT = (
+    select(DBDreamSession.id, DBDreamSession.status, DBDreamSession.updated_at)
+    .where(DBDreamSession.id == bindparam("sid"))
+)
+_ANALYZE_PRECONDITION_STMT = (
+    select(DBDreamSession.id, DBDreamSession.dream_text)
+    .where(DBDreamSession.id == bindparam("sid"))
+)
+_IRT_PRECONDITION_STMT = (
+    select(DBDreamSession.id, DBDreamSession.analysis_results.is_not(None).label("has_analysis"))
+    .where(DBDreamSession.id == bindparam("sid"))
+)
+
+def _to_session_response(sess: DBDreamSession) -> DreamSessionResponse:
+    """
+    신뢰할 수 있는 ORM 행을 응답 모델로 변환합니다.
+    DB에 저장된 값은 쓰기 시점에 이미 검증되었으므로 model_validate 대신
+    model_construct를 사용하여 pydantic 필드 검증/강제 변환 비용을 생략합니다.
+    """
+    return DreamSessionResponse.model_construct(
+        id=sess.id,
+        dream_text=sess.dream_text,
+        status=sess.status,
+        analysis_results=sess.analysis_results,
+        irt_results=sess.irt_results,
+        generated_images=sess.generated_images or [],
+        created_at=sess.created_at,
+        updated_at=sess.updated_at,
+    )
+
 # 예외 핸들러는 main.py 또는 별도의 파일에서 전역적으로 설정할 수 있습니다.
 # 여기서는 ServiceException 발생 시 HTTPException으로 변환하여 반환합니다.
 @router.post("/sessions", response_model=DreamSessionResponse, status_code=status.HTTP_201_CREATED, summary="새로운 꿈 분석 세션을 시작하고 음성을 텍스트로 변환")
@@ -30,140 +77,302 @@ async def create_dream_session(
     """
     logger.info(f"API Call: create_dream_session - received file '{audio_file.filename}' ({audio_file.content_type})")
     try:
-        audio_content = await audio_file.read()
+        # 업로드 파일을 한 번에 메모리로 읽지 않고 64KB 청크 단위로 스트리밍합니다.
+        # 작은 파일은 메모리에, 임계치(1MB)를 넘는 파일은 자동으로 디스크에 스풀링되어
+        # 피크 메모리 사용량이 파일 크기가 아닌 청크 크기에 비례하게 됩니다.
+        # STT가 전체 시간을 지배하므로, 빈 행의 INSERT(flush)를 STT와 동시에
+        # 실행하여 DB 왕복 지연을 요청의 임계 경로에서 제거합니다.
+        db_session = DBDreamSession(dream_text="", status="transcribing")
+        db.add(db_session) # DB에 추가
+
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spooled_audio:
+            while chunk := await audio_file.read(65536):
+                spooled_audio.write(chunk)
 
-        # STAGE 1: 음성-텍스트 변환
-        dream_text = await pipeline.audio_service.speech_to_text(audio_content)
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    # STAGE 1: 음성-텍스트 변환 (파일 핸들을 그대로 전달하여 httpx가 스트리밍하도록 함)
+                    stt_task = tg.create_task(pipeline.audio_service.speech_to_text(
+                        spooled_audio, filename=audio_file.filename or "dream_audio.wav"
+                    ))
+                    tg.create_task(db.flush()) # INSERT를 STT와 중첩 실행
+            except* Exception as eg:
+                # 기존 예외 처리 경로는 단일 예외를 기대하므로 첫 번째 예외를 전파합니다.
+                raise eg.exceptions[0]
+            dream_text = stt_task.result()
         logger.info(f"STT successful for new session. Text: '{dream_text[:50]}...'")
 
-        # 새 DreamSession DB 모델 인스턴스 생성 및 저장
-        db_session = DBDreamSession(dream_text=dream_text)
-        db.add(db_session) # DB에 추가
+        # 클라이언트가 곧 /analyze를 호출할 것이므로, 응답 왕복 동안
+        # RAG 검색을 미리 시작해 둡니다. (Whisper API는 부분 전사 스트리밍을
+        # 지원하지 않으므로, STT 완료 직후가 가장 이른 중첩 시점입니다.)
+        try:
+            pipeline.analysis_service.prefetch_context(dream_text)
+        except Exception as e:
+            logger.warning("Context prefetch failed (analysis will retrieve on demand): %s", e)
+
+        # STT 결과를 반영하고 커밋
+        db_session.dream_text = dream_text
+        db_session.status = "pending"
         await db.commit() # 변경사항 커밋
-        await db.refresh(db_session) # DB에서 최신 상태로 새로고침 (id, created_at 등 포함)
+        # refresh는 불필요: flush의 INSERT가 RETURNING으로 id/created_at/updated_at을
+        # 이미 채웠고, expire_on_commit=False라 커밋 후에도 속성이 유지됩니다.
 
         logger.info(f"Dream session {db_session.id} created successfully.")
-        return DreamSessionResponse.model_validate(db_session) # Pydantic 모델로 변환하여 응답 (v2)
+        return _to_session_response(db_session) # 검증 생략 고속 경로로 변환
     except ServiceException as e:
-        logger.error(f"Service error in create_dream_session: {e.message}", exc_info=True)
+        logger.error("Service error in create_dream_session: %s", e.message, exc_info=True)
         raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
-        logger.critical(f"Unhandled error in create_dream_session: {e}", exc_info=True)
+        logger.critical("Unhandled error in create_dream_session: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {e}")
 
 @router.get("/sessions/{session_id}", response_model=DreamSessionResponse, summary="특정 꿈 분석 세션 정보 조회")
-async def get_dream_session(session_id: int, db: AsyncSession = Depends(get_db)):
+async def get_dream_session(session_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """
     특정 `session_id`에 해당하는 꿈 분석 세션의 상세 정보를 조회합니다.
+    프런트엔드가 파이프라인 진행 중 이 엔드포인트를 폴링하므로 ETag를 제공하며,
+    `If-None-Match`가 일치하면 큰 JSON 본문 직렬화 없이 304를 반환합니다.
     """
     logger.info(f"API Call: get_dream_session - session_id: {session_id}")
     try:
-        # DB에서 세션 조회
-        result = await db.execute(select(DBDreamSession).filter(DBDreamSession.id == session_id))
-        session = result.scalars().first() # 첫 번째 결과 가져오기
+        # ETag 계산에는 id와 updated_at만 필요하므로 큰 JSON 컬럼은 읽지 않습니다.
+        row = (await db.execute(_SESSION_VERSION_STMT, {"sid": session_id})).first()
 
-        if not session:
-            logger.warning(f"Session with ID {session_id} not found.")
+        if not row:
+            logger.warning("Session with ID %s not found.", session_id)
             raise NotFoundException(f"Session with ID {session_id} not found.")
-        
-        return DreamSessionResponse.model_validate(session) # Pydantic 모델로 변환
+
+        # 행이 갱신될 때마다 updated_at이 바뀌지만, SQLite의 func.now()는 초 단위라
+        # 같은 초 안에서 running→done으로 바뀌면 updated_at만으로는 구분되지 않습니다.
+        # status를 함께 해시하여 상태 전이가 항상 새 ETag를 만들도록 합니다.
+        etag = hashlib.blake2b(f"{row.id}:{row.status}:{row.updated_at.timestamp()}".encode(), digest_size=16).hexdigest()
+        if request.headers.get("if-none-match") == etag:
+            logger.debug(f"ETag match for session {session_id} - returning 304.")
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        # ETag 불일치(또는 최초 요청)일 때만 전체 행을 로드합니다.
+        session = await db.get(DBDreamSession, session_id)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, max-age=0, must-revalidate"
+        return _to_session_response(session) # 검증 생략 고속 경로로 변환
     except NotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
-        logger.critical(f"Unhandled error in get_dream_session: {e}", exc_info=True)
+        logger.critical("Unhandled error in get_dream_session: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {e}")
 
 
-@router.post("/sessions/{session_id}/analyze", response_model=DreamAnalysisResponse, summary="세션의 꿈 텍스트를 분석하고 이미지 생성")
+# ----------------------------------------------------
+# 백그라운드 작업 함수들
+# 요청 핸들러가 202를 반환한 뒤 실행되며, 자체 DB 세션을 열어 결과를 저장합니다.
+# ----------------------------------------------------
+async def _store_analysis_results(session_id: int, analysis_result_dict: Dict[str, Any],
+                                  generated_image_url: str, healing_image_url: str):
+    """분석/이미지 결과를 세션 행에 저장합니다 (백그라운드/스트리밍 경로 공용)."""
+    # 읽기 경로(_to_session_response)는 model_construct로 검증을 생략하므로,
+    # LLM 출력이 스키마에 맞는지는 저장 직전 여기서 한 번만 검증합니다.
+    # (작업당 1회라 비용이 미미하고, 실패 시 세션이 error로 표시됩니다.)
+    DREAM_RESULT_ADAPTER.validate_python(analysis_result_dict)
+    async with AsyncSessionLocal() as db:
+        new_entry = {"original": str(generated_image_url), "healing": str(healing_image_url)}
+        if db.get_bind().dialect.name == "postgresql":
+            # JSONB || 연산으로 DB 안에서 원자적으로 append하여
+            # 동시 쓰기 간의 read-modify-write 경합(lost update)을 제거합니다.
+            generated_images = func.coalesce(
+                DBDreamSession.generated_images, cast([], JSONB)
+            ).op("||")(cast([new_entry], JSONB))
+        else:
+            # SQLite 등은 JSONB 연산자가 없으므로 파이썬에서 append합니다.
+            session = await db.get(DBDreamSession, session_id)
+            generated_images = list(session.generated_images or []) + [new_entry]
+
+        await db.execute(
+            update(DBDreamSession)
+            .where(DBDreamSession.id == session_id)
+            .values(analysis_results=analysis_result_dict, generated_images=generated_images, status="done")
+        )
+        await db.commit()
+
+async def _mark_session_error(session_id: int):
+    """실패한 백그라운드/스트리밍 작업의 세션 상태를 error로 표시합니다."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(DBDreamSession).where(DBDreamSession.id == session_id).values(status="error"))
+        await db.commit()
+
+async def _run_analysis_job(session_id: int, pipeline: DreamPipeline):
+    """STAGE 2-4(분석 + 이미지 생성)를 백그라운드에서 실행하고 결과를 저장합니다."""
+    try:
+        async with AsyncSessionLocal() as db:
+            session = await db.get(DBDreamSession, session_id)
+            dream_text = session.dream_text
+        analysis_result_dict, generated_image_url, healing_image_url = await pipeline.run_analysis_and_image_stages(dream_text)
+        await _store_analysis_results(session_id, analysis_result_dict, generated_image_url, healing_image_url)
+        logger.info(f"Background analysis completed for session {session_id}.")
+    except Exception as e:
+        logger.error("Background analysis failed for session %s: %s", session_id, e, exc_info=True)
+        await _mark_session_error(session_id)
+
+async def _run_irt_job(session_id: int, pipeline: DreamPipeline):
+    """STAGE 5(IRT 분석)를 백그라운드에서 실행하고 결과를 저장합니다."""
+    async with AsyncSessionLocal() as db:
+        try:
+            session = await db.get(DBDreamSession, session_id)
+            irt_results_dict = await pipeline.run_irt_stage(session.dream_text, session.analysis_results)
+
+            # 읽기 경로의 검증 생략(model_construct)을 뒷받침하는 쓰기 시점 검증입니다.
+            IRT_RESULT_ADAPTER.validate_python(irt_results_dict)
+            await db.execute(
+                update(DBDreamSession)
+                .where(DBDreamSession.id == session_id)
+                .values(irt_results=irt_results_dict, status="done")
+            )
+            await db.commit()
+            logger.info(f"Background IRT analysis completed for session {session_id}.")
+        except Exception as e:
+            logger.error("Background IRT analysis failed for session %s: %s", session_id, e, exc_info=True)
+            await db.rollback()
+            await db.execute(update(DBDreamSession).where(DBDreamSession.id == session_id).values(status="error"))
+            await db.commit()
+
+@router.post("/sessions/{session_id}/analyze", response_model=AnalysisJobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED, summary="세션의 꿈 분석 및 이미지 생성 작업을 백그라운드로 접수")
 async def analyze_dream_and_generate_image(
     session_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     pipeline: DreamPipeline = Depends(get_dream_pipeline)
 ):
     """
-    기존 세션의 꿈 텍스트를 바탕으로 심층 분석을 수행하고,
-    분석 결과에 기반한 DALL-E 이미지를 생성합니다 (STAGE 2, 3, 4).
+    기존 세션의 꿈 텍스트에 대한 심층 분석 + 이미지 생성(STAGE 2, 3, 4)을
+    백그라운드 작업으로 접수하고 즉시 202를 반환합니다.
+    전체 파이프라인은 10~40초가 걸리므로 HTTP 연결을 붙잡아 두지 않고,
+    클라이언트는 `GET /api/sessions/{session_id}`를 폴링하여 status가
+    'done'이 되면 결과를 확인합니다.
     """
     logger.info(f"API Call: analyze_dream_and_generate_image - session_id: {session_id}")
     try:
-        # DB에서 세션 조회
-        result = await db.execute(select(DBDreamSession).filter(DBDreamSession.id == session_id))
-        session = result.scalars().first()
+        # 사전 조건 확인에는 id와 dream_text만 필요하므로 큰 JSON 컬럼은 읽지 않습니다.
+        # (전체 행은 백그라운드 작업이 자체 세션에서 로드합니다.)
+        row = (await db.execute(_ANALYZE_PRECONDITION_STMT, {"sid": session_id})).first()
 
-        if not session:
-            logger.warning(f"Session with ID {session_id} not found for analysis.")
+        if not row:
+            logger.warning("Session with ID %s not found for analysis.", session_id)
             raise NotFoundException(f"Session with ID {session_id} not found.")
-        
-        if not session.dream_text:
-            logger.warning(f"Dream text missing for session {session_id} before analysis.")
+
+        if not row.dream_text:
+            logger.warning("Dream text missing for session %s before analysis.", session_id)
             raise BadRequestException(f"Dream text missing for session {session_id}. Please create session with audio first.")
 
-        # 파이프라인의 STAGE 2-4 실행 (분석 및 이미지 생성)
-        analysis_result_dict, generated_image_url, healing_image_url = await pipeline.run_analysis_and_image_stages(session.dream_text)
+        # 작업 접수: 상태를 running으로 표시한 뒤 백그라운드에서 파이프라인 실행
+        await db.execute(update(DBDreamSession).where(DBDreamSession.id == session_id).values(status="running"))
+        await db.commit()
+        background_tasks.add_task(_run_analysis_job, session_id, pipeline)
 
-        # DB 세션 업데이트
-        session.analysis_results = analysis_result_dict # 분석 결과 저장
-        # 이미지 URL은 리스트 형태로 저장될 수 있도록 합니다.
-        if session.generated_images is None:
-            session.generated_images = []
-        session.generated_images.append({"original": str(generated_image_url), "healing": str(healing_image_url)})
-        
-        await db.commit() # 변경사항 커밋
-        await db.refresh(session) # DB에서 최신 상태로 새로고침
-
-        logger.info(f"Dream analysis and image generation completed for session {session_id}.")
-        return DreamAnalysisResponse(
+        logger.info(f"Dream analysis job accepted for session {session_id}.")
+        return AnalysisJobAcceptedResponse(
             session_id=session_id,
-            analysis_results=analysis_result_dict,
-            generated_image_url=generated_image_url,
-            healing_image_url=healing_image_url
+            status="running",
+            poll_url=f"/api/sessions/{session_id}"
         )
     except (NotFoundException, BadRequestException, ServiceException) as e:
-        logger.error(f"Service error in analyze_dream_and_generate_image: {e.message}", exc_info=True)
+        logger.error("Service error in analyze_dream_and_generate_image: %s", e.message, exc_info=True)
         raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
-        logger.critical(f"Unhandled error in analyze_dream_and_generate_image: {e}", exc_info=True)
+        logger.critical("Unhandled error in analyze_dream_and_generate_image: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {e}")
 
-@router.post("/sessions/{session_id}/irt", response_model=IrtAnalysisResponse, summary="IRT(Imagery Rescripting Therapy) 분석 수행")
+@router.post("/sessions/{session_id}/analyze/stream", summary="꿈 분석 결과를 SSE로 스트리밍 (부분 결과 즉시 전송)")
+async def analyze_dream_with_streaming(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    pipeline: DreamPipeline = Depends(get_dream_pipeline)
+):
+    """
+    `/analyze`의 스트리밍 변형입니다. GPT-4o가 JSON을 생성하는 동안 부분 분석
+    결과를 SSE(`text/event-stream`)로 즉시 내려보내, 클라이언트의 체감 지연을
+    전체 생성 시간(3~8초)에서 첫 토큰 시간(~0.5초)으로 줄입니다.
+    스트림이 끝나면 결과는 `/analyze`와 동일하게 DB에 저장되므로
+    이후의 `GET /api/sessions/{session_id}` 폴링과도 호환됩니다.
+    """
+    logger.info(f"API Call: analyze_dream_with_streaming - session_id: {session_id}")
+    try:
+        row = (await db.execute(_ANALYZE_PRECONDITION_STMT, {"sid": session_id})).first()
+
+        if not row:
+            logger.warning("Session with ID %s not found for streaming analysis.", session_id)
+            raise NotFoundException(f"Session with ID {session_id} not found.")
+
+        if not row.dream_text:
+            logger.warning("Dream text missing for session %s before streaming analysis.", session_id)
+            raise BadRequestException(f"Dream text missing for session {session_id}. Please create session with audio first.")
+
+        await db.execute(update(DBDreamSession).where(DBDreamSession.id == session_id).values(status="running"))
+        await db.commit()
+        dream_text = row.dream_text
+    except (NotFoundException, BadRequestException) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    async def event_stream():
+        try:
+            final = None
+            async for event in pipeline.run_analysis_and_image_stages_stream(dream_text):
+                if event["type"] == "result":
+                    final = event["data"]
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+            await _store_analysis_results(
+                session_id,
+                final["analysis_results"],
+                final["original_image_url"],
+                final["healing_image_url"],
+            )
+            yield 'data: {"type": "done"}\n\n'
+        except Exception as e:
+            # 스트림이 시작된 뒤에는 상태 코드를 바꿀 수 없으므로 에러 이벤트로 알립니다.
+            logger.error("Streaming analysis failed for session %s: %s", session_id, e, exc_info=True)
+            await _mark_session_error(session_id)
+            yield f"data: {json.dumps({'type': 'error', 'detail': str(e)}, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@router.post("/sessions/{session_id}/irt", response_model=AnalysisJobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED, summary="IRT(Imagery Rescripting Therapy) 분석 작업을 백그라운드로 접수")
 async def perform_irt_analysis(
     session_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     pipeline: DreamPipeline = Depends(get_dream_pipeline)
 ):
     """
-    특정 `session_id`의 꿈 텍스트에 대해 IRT(Imagery Rescripting Therapy) 분석을 수행합니다 (STAGE 5).
+    특정 `session_id`의 꿈 텍스트에 대한 IRT 분석(STAGE 5)을
+    백그라운드 작업으로 접수하고 즉시 202를 반환합니다.
+    클라이언트는 `GET /api/sessions/{session_id}`를 폴링하여 결과를 확인합니다.
     """
     logger.info(f"API Call: perform_irt_analysis - session_id: {session_id}")
     try:
-        # DB에서 세션 조회
-        result = await db.execute(select(DBDreamSession).filter(DBDreamSession.id == session_id))
-        session = result.scalars().first()
+        # 분석 결과 존재 여부만 확인하면 되므로 수 KB짜리 JSON 블롭 대신
+        # boolean 표현식만 SELECT하여 전송량과 ORM 하이드레이션을 아낍니다.
+        row = (await db.execute(_IRT_PRECONDITION_STMT, {"sid": session_id})).first()
 
-        if not session:
-            logger.warning(f"Session with ID {session_id} not found for IRT analysis.")
+        if not row:
+            logger.warning("Session with ID %s not found for IRT analysis.", session_id)
             raise NotFoundException(f"Session with ID {session_id} not found.")
-        
-        if not session.analysis_results:
-            logger.warning(f"Analysis results missing for session {session_id} before IRT.")
-            raise BadRequestException(f"Analysis must be performed for session {session_id} before IRT.")
 
-        # 파이프라인의 STAGE 5 실행 (IRT 분석)
-        irt_results_dict = await pipeline.run_irt_stage(session.dream_text, session.analysis_results)
+        if not row.has_analysis:
+            logger.warning("Analysis results missing for session %s before IRT.", session_id)
+            raise BadRequestException(f"Analysis must be performed for session {session_id} before IRT.")
 
-        # DB 세션 업데이트
-        session.irt_results = irt_results_dict # IRT 결과 저장
-        await db.commit() # 변경사항 커밋
-        await db.refresh(session) # DB에서 최신 상태로 새로고침
+        # 작업 접수: 상태를 running으로 표시한 뒤 백그라운드에서 IRT 스테이지 실행
+        await db.execute(update(DBDreamSession).where(DBDreamSession.id == session_id).values(status="running"))
+        await db.commit()
+        background_tasks.add_task(_run_irt_job, session_id, pipeline)
 
-        logger.info(f"IRT analysis completed for session {session_id}.")
-        return IrtAnalysisResponse(
+        logger.info(f"IRT analysis job accepted for session {session_id}.")
+        return AnalysisJobAcceptedResponse(
             session_id=session_id,
-            irt_results=irt_results_dict
+            status="running",
+            poll_url=f"/api/sessions/{session_id}"
         )
     except (NotFoundException, BadRequestException, ServiceException) as e:
-        logger.error(f"Service error in perform_irt_analysis: {e.message}", exc_info=True)
+        logger.error("Service error in perform_irt_analysis: %s", e.message, exc_info=True)
         raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
-        logger.critical(f"Unhandled error in perform_irt_analysis: {e}", exc_info=True)
+        logger.critical("Unhandled error in perform_irt_analysis: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {e}")
\ No newline at end of file
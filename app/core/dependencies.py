@@ -1,5 +1,5 @@
 # app/core/dependencies.py
-from fastapi import Depends
+from functools import lru_cache # 프로세스 단위 싱글턴 캐싱을 위해 임포트
 # 서비스 클래스들을 임포트합니다.
 from ..services.audio_service import AudioService
 from ..services.analysis_service import AnalysisService
@@ -12,39 +12,50 @@ logger = get_logger(__name__)
 
 # ----------------------------------------------------
 # 서비스 인스턴스를 제공하는 의존성 함수들
-# 각 요청마다 새로운 인스턴스를 생성하거나, 싱글턴 패턴을 적용할 수 있습니다.
-# 여기서는 단순화를 위해 매 요청마다 새 인스턴스를 생성하는 것으로 가정합니다.
+# 각 서비스는 내부에서 OpenAI 클라이언트, Chroma 핸들 등 비싼 리소스를
+# 초기화하므로 lru_cache로 워커당 하나의 인스턴스만 생성하여 재사용합니다.
+# (매 요청마다 새로 만들면 TLS 수립/모델 설정 파싱 비용이 반복됩니다.)
 # ----------------------------------------------------
+@lru_cache(maxsize=1)
 def get_audio_service() -> AudioService:
-    """오디오 서비스 인스턴스를 반환합니다."""
-    # 실제 애플리케이션에서는 서비스 초기화 시 필요한 의존성을 주입할 수 있습니다.
+    """오디오 서비스 싱글턴 인스턴스를 반환합니다."""
     logger.debug("Providing AudioService instance.")
     return AudioService()
 
+@lru_cache(maxsize=1)
 def get_analysis_service() -> AnalysisService:
-    """분석 서비스 인스턴스를 반환합니다."""
+    """분석 서비스 싱글턴 인스턴스를 반환합니다."""
     logger.debug("Providing AnalysisService instance.")
     return AnalysisService()
 
+@lru_cache(maxsize=1)
 def get_image_service() -> ImageService:
-    """이미지 서비스 인스턴스를 반환합니다."""
+    """이미지 서비스 싱글턴 인스턴스를 반환합니다."""
     logger.debug("Providing ImageService instance.")
     return ImageService()
 
 # ----------------------------------------------------
 # DreamPipeline 인스턴스를 제공하는 의존성 함수
-# 이 함수는 위에 정의된 서비스 의존성을 주입받아 파이프라인을 구성합니다.
+# Depends 파라미터는 lru_cache 메모이제이션을 무력화하므로,
+# 캐시된 getter들을 함수 본문에서 직접 호출하여 파이프라인을 구성합니다.
 # ----------------------------------------------------
-def get_dream_pipeline(
-    audio_service: AudioService = Depends(get_audio_service),
-    analysis_service: AnalysisService = Depends(get_analysis_service),
-    image_service: ImageService = Depends(get_image_service)
-) -> DreamPipeline:
+@lru_cache(maxsize=1)
+def build_dream_pipeline() -> DreamPipeline:
     """
-    DreamPipeline 인스턴스를 반환합니다.
-    내부적으로 AudioService, AnalysisService, ImageService를 주입받습니다.
+    DreamPipeline 싱글턴 인스턴스를 반환하는 동기 빌더입니다.
+    (lifespan 워밍업처럼 비-요청 경로에서 직접 호출할 때 사용합니다.)
+    내부적으로 캐시된 AudioService, AnalysisService, ImageService를 사용합니다.
     """
     logger.debug("Providing DreamPipeline instance.")
-    return DreamPipeline(audio_service, analysis_service, image_service)
+    return DreamPipeline(get_audio_service(), get_analysis_service(), get_image_service())
+
+async def get_dream_pipeline() -> DreamPipeline:
+    """
+    Depends용 파이프라인 제공자.
+    동기 `def` 의존성은 FastAPI가 run_in_threadpool로 우회 실행하여 요청마다
+    스레드 컨텍스트 스위치 비용을 내므로, 이벤트 루프에서 바로 해석되도록
+    async로 감쌉니다. (본문은 캐시 조회뿐이라 블로킹이 없습니다.)
+    """
+    return build_dream_pipeline()
 
 # 이 외에 사용자 인증, 권한 부여 등 다양한 의존성을 여기에 정의할 수 있습니다.
\ No newline at end of file
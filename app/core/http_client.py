@@ -0,0 +1,30 @@
+# app/core/http_client.py
+import httpx
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ----------------------------------------------------
+# 프로세스 전역 공유 HTTP 클라이언트
+# OpenAI(Whisper/GPT-4o/DALL-E) 호출마다 새 클라이언트를 만들면
+# TLS 핸드셰이크와 TCP 연결 수립 비용(~100-300ms)을 매번 지불하게 됩니다.
+# keep-alive + HTTP/2로 연결을 재사용하고, 동시 호출은 하나의 연결 위에서
+# 멀티플렉싱되도록 모든 서비스가 이 인스턴스를 공유합니다.
+# 종료 시 정리는 main.py의 lifespan에서 close_http_client()로 수행합니다.
+# ----------------------------------------------------
+HTTP_CLIENT = httpx.AsyncClient(
+    http2=True,
+    # 전체 60초(LLM/이미지 생성은 오래 걸릴 수 있음), 연결 수립은 5초로 짧게 —
+    # 연결 실패를 빨리 감지해야 SDK의 백오프 재시도가 제때 동작합니다.
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    # STT+분석+이미지가 겹치는 피크에도 유휴 연결을 충분히 유지해
+    # 재핸드셰이크 없이 멀티플렉싱되도록 keep-alive 풀을 넉넉히 둡니다.
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+)
+
+
+async def close_http_client() -> None:
+    """애플리케이션 종료 시 공유 HTTP 클라이언트의 연결 풀을 정리합니다."""
+    logger.info("Closing shared HTTP client...")
+    await HTTP_CLIENT.aclose()
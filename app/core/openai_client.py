@@ -0,0 +1,27 @@
+# app/core/openai_client.py
+import openai
+
+from .settings import settings
+from .http_client import HTTP_CLIENT # 공유 HTTP 클라이언트 (keep-alive + HTTP/2)
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ----------------------------------------------------
+# 프로세스 전역 공유 OpenAI 클라이언트
+# 서비스마다 openai.AsyncClient()를 따로 만들면 각자 자체 커넥션 풀과
+# TLS 세션 캐시를 소유하게 되어 HTTP/2 멀티플렉싱의 이점을 잃습니다.
+# Whisper/DALL-E 호출은 모두 이 싱글턴을 통해 이루어지며,
+# 내부 전송은 http_client.py의 공유 httpx 클라이언트를 사용합니다.
+# (전송 계층 정리는 lifespan의 close_http_client()가 담당합니다.)
+# ----------------------------------------------------
+OPENAI_CLIENT = openai.AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    http_client=HTTP_CLIENT,
+    max_retries=settings.OPENAI_MAX_RETRIES, # 429/일시 오류는 지수 백오프로 재시도
+)
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    """공유 OpenAI 클라이언트 싱글턴을 반환합니다."""
+    return OPENAI_CLIENT
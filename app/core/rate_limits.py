@@ -0,0 +1,14 @@
+# app/core/rate_limits.py
+import asyncio
+
+from .settings import settings
+
+# ----------------------------------------------------
+# 모델별 동시 호출 상한 (프로세스 전역)
+# 무제한 fan-out은 OpenAI TPM/RPM 한도에 걸려 모든 호출이 429-재시도
+# 루프에 빠지게 되므로, 모델별 세마포어로 동시 호출 수를 요금제 한도
+# 이하로 묶습니다. 한도 내에서는 여전히 병렬로 실행됩니다.
+# 재시도는 공유 OpenAI 클라이언트의 max_retries(지수 백오프)가 담당합니다.
+# ----------------------------------------------------
+DALLE_SEMAPHORE = asyncio.Semaphore(settings.DALLE_MAX_CONCURRENCY)
+GPT4O_SEMAPHORE = asyncio.Semaphore(settings.GPT4O_MAX_CONCURRENCY)
@@ -1,6 +1,10 @@
 # app/core/settings.py
+# 이 모듈이 프로젝트의 유일한 설정 소스입니다.
+# (과거 app/core/config.py와 중복되어 Settings()가 두 번 인스턴스화되고
+#  env 파싱이 반복되던 문제를 해결하기 위해 이 파일로 일원화했습니다.)
+from functools import lru_cache # Settings 인스턴스를 한 번만 생성하기 위해 임포트
+from typing import Optional
 from pydantic_settings import BaseSettings # SettingsConfigDict 임포트 제거
-# import os # os 모듈이 다른 곳에서 사용되지 않는다면 제거해도 무방합니다.
 
 class Settings(BaseSettings):
     # .env 파일에서 환경 변수를 로드하는 설정을 완전히 제거합니다.
@@ -12,22 +16,42 @@ class Settings(BaseSettings):
 
     # API Keys (필수 환경 변수)
     OPENAI_API_KEY: str
-    DEEPL_API_KEY: str = None # 선택 사항
+    DEEPL_API_KEY: Optional[str] = None # 선택 사항
 
     # Database Settings
     DATABASE_URL: str = "sqlite+aiosqlite:///./sql_app.db" # 비동기 SQLite DB
 
     # RAG Settings
     CHROMA_DB_PATH: str = "./data/vector_store"
+    # 인메모리 FAISS 인덱스 경로 (있으면 ChromaDB 대신 사용)
+    FAISS_INDEX_PATH: str = "./data/faiss_index"
     RAG_CHUNK_SIZE: int = 1000
     
     RAG_CHUNK_OVERLAP: int = 200
+    # 임베딩 결과를 디스크에 캐시하여 동일 텍스트의 재임베딩 API 호출을 제거
+    EMBED_CACHE_DIR: str = "./.embed_cache"
+    # CAG (Cache-Augmented Generation): 코퍼스가 아래 토큰 상한보다 작으면
+    # 검색(RAG) 대신 전체 코퍼스를 시스템 프롬프트에 고정 접두사로 포함합니다.
+    KNOWLEDGE_BASE_PATH: str = "./data/knowledge_base"
+    CAG_MAX_CORPUS_TOKENS: int = 30000
 
     # AI Model Settings
     DALL_E_IMAGE_SIZE: str = "1024x1024"
     DALL_E_IMAGE_QUALITY: str = "standard"
     WHISPER_MODEL_NAME: str = "whisper-1"
 
+    # Rate Limiting (모델별 동시 호출 상한 — 요금제 티어에 맞춰 조정)
+    DALLE_MAX_CONCURRENCY: int = 5
+    GPT4O_MAX_CONCURRENCY: int = 8
+    OPENAI_MAX_RETRIES: int = 5 # 429/일시 오류에 대한 SDK 지수 백오프 재시도 횟수
+
+    # Generated Image Storage
+    # OpenAI가 반환하는 이미지 URL은 약 1시간 후 만료되므로,
+    # 생성된 이미지를 로컬에 영구 저장하고 아래 경로로 서빙합니다.
+    GENERATED_IMAGE_DIR: str = "./data/generated_images"
+    # 클라이언트에 돌려줄 절대 URL의 베이스 (배포 환경에서는 CDN/도메인으로 교체)
+    PUBLIC_BASE_URL: str = "http://localhost:8000"
+
     # Environment
     ENVIRONMENT: str = "development"
 
@@ -35,4 +59,14 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO" # INFO, DEBUG, WARNING, ERROR, CRITICAL
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Settings 싱글턴을 반환합니다.
+    env 파싱과 검증 그래프 생성은 비용이 있으므로 프로세스당 한 번만 수행합니다.
+    """
+    return Settings()
+
+
+# 기존 코드와의 호환을 위한 모듈 레벨 인스턴스 (get_settings를 통해 단 한 번 생성됨)
+settings = get_settings()
\ No newline at end of file
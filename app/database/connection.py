@@ -1,4 +1,5 @@
 # app/database/connection.py
+import orjson # stdlib json보다 수 배 빠른 JSON 직렬화 (JSON 컬럼 읽기/쓰기에 사용)
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base # ORM Base 클래스
 from ..core.settings import settings # settings.py에서 DB URL을 가져오기 위해 임포트
@@ -7,8 +8,34 @@ from ..utils.logger import get_logger # 로깅을 위해 임포트
 logger = get_logger(__name__)
 
 # 비동기 엔진 생성
-# echo=True는 모든 SQL 쿼리를 콘솔에 로깅하여 디버깅에 유용합니다.
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+# echo는 모든 SQL 쿼리를 콘솔에 로깅하므로 개발 환경에서만 켭니다.
+# (운영 환경에서 켜두면 모든 쿼리가 Python 로깅을 거쳐 직렬화되어 처리량이 급감합니다.)
+_engine_kwargs = {
+    "echo": settings.ENVIRONMENT == "development",
+    # analysis_results / irt_results / generated_images 같은 JSON 컬럼의
+    # 직렬화/역직렬화를 orjson으로 처리하여 CPU 사용량을 줄입니다.
+    "json_serializer": lambda value: orjson.dumps(value).decode(),
+    "json_deserializer": orjson.loads,
+}
+
+if not settings.DATABASE_URL.startswith("sqlite"):
+    # PostgreSQL 등 서버형 DB에서는 기본 pool_size=5가 동시 요청을 굶기므로
+    # 풀 크기를 명시적으로 지정합니다. SQLite는 파일 기반이라 해당되지 않습니다.
+    _engine_kwargs.update(
+        pool_size=20,           # 상시 유지할 연결 수
+        max_overflow=40,        # 순간 부하 시 추가로 허용할 연결 수
+        pool_pre_ping=True,     # 끊어진 연결을 사용하기 전에 감지
+        pool_recycle=1800,      # 30분마다 연결 재생성 (방화벽/LB 타임아웃 대비)
+    )
+    if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+        # pgbouncer 등과의 호환을 위해 asyncpg 자체 statement 캐시는 끄고,
+        # SQLAlchemy 다이얼렉트 레벨의 prepared statement 캐시를 사용합니다.
+        _engine_kwargs["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 500,
+        }
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_kwargs)
 
 # 세션 팩토리 생성
 # autocommit=False: 트랜잭션 수동 커밋 필요
@@ -15,6 +15,10 @@ async def get_db() -> AsyncGenerator[AsyncSession, Any]: # 이 부분을 수정
     """
     FastAPI 의존성 주입을 위한 데이터베이스 세션 제공자.
     요청마다 새로운 세션을 생성하고, 응답 후 세션을 닫습니다.
+
+    반드시 `async def`로 유지하세요 — 동기 제너레이터 의존성은 FastAPI가
+    run_in_threadpool로 우회 실행하여 요청마다 스레드 컨텍스트 스위치
+    비용이 추가됩니다. (테스트의 override_get_db도 같은 이유로 async입니다.)
     """
     db = AsyncSessionLocal()
     try:
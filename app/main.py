@@ -1,9 +1,15 @@
 # app/main.py
+import asyncio # 커넥션 풀 워밍업을 위해 임포트
+import os # 생성 이미지 저장 디렉토리 준비에 사용
 from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles # 생성 이미지 서빙용
+from sqlalchemy import text # 워밍업 쿼리(SELECT 1)에 사용
+from fastapi.responses import JSONResponse # 전역 예외 핸들러 응답용
 from contextlib import asynccontextmanager # 애플리케이션 라이프사이클 관리
 from .api.dream_routes import router as dream_router # API 라우터 임포트
 from .core.settings import settings # 설정 임포트
+from .core.http_client import close_http_client # 공유 HTTP 클라이언트 정리 함수
+from .core.dependencies import build_dream_pipeline # 파이프라인 싱글턴 워밍업용
 from .database.connection import engine, Base # DB 엔진 및 Base 임포트
 from .utils.logger import get_logger # 로거 임포트
 from .utils.exceptions import ServiceException # 커스텀 예외 임포트
@@ -32,10 +38,34 @@ async def lifespan(app: FastAPI):
         # DB 연결 실패 시 앱 시작을 막을 수 있음 (배포 환경에서 중요)
         # raise RuntimeError(f"Database initialization failed: {e}")
 
+    # 2. 커넥션 풀 워밍업: 트래픽을 받기 전에 SELECT 1을 동시 실행하여
+    # 풀에 연결을 미리 채워둡니다. (첫 요청들이 연결 수립 비용을 내지 않도록)
+    if not settings.DATABASE_URL.startswith("sqlite"):
+        async def _warm_connection():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        try:
+            await asyncio.gather(*(_warm_connection() for _ in range(5)))
+            logger.info("Database connection pool warmed up.")
+        except Exception as e:
+            logger.warning(f"Connection pool warmup failed (continuing anyway): {e}")
+
+    # 3. 서비스/파이프라인 워밍업: lru_cache 싱글턴을 미리 생성하여
+    # 첫 요청이 ChatOpenAI/Chroma 초기화(pydantic 스키마 빌드 포함) 비용을
+    # 내지 않도록 합니다. 토크나이저 인코딩도 미리 로드합니다.
+    try:
+        build_dream_pipeline()
+        import tiktoken
+        tiktoken.encoding_for_model("gpt-4o")
+        logger.info("Pipeline services and tokenizer pre-warmed.")
+    except Exception as e:
+        logger.warning(f"Service pre-warm failed (continuing anyway): {e}")
+
     yield # 애플리케이션이 실행되는 동안
 
     # 2. 애플리케이션 종료 시 정리 작업 (예: DB 연결 풀 정리 등)
     logger.info("Application lifespan: Shutting down...")
+    await close_http_client() # 공유 HTTP 클라이언트 연결 풀 정리
     # SQLAlchemy 엔진은 보통 애플리케이션 종료 시 자동으로 연결을 정리합니다.
     # 명시적으로 close()를 호출할 필요는 없지만, 필요한 경우 추가할 수 있습니다.
     # await engine.dispose()
@@ -49,6 +79,9 @@ app = FastAPI(
     version=settings.PROJECT_VERSION,
     description="My Dream Project API for dream analysis and interpretation using LLMs and RAG.",
     lifespan=lifespan, # lifespan 이벤트 추가
+    # default_response_class=ORJSONResponse는 FastAPI 0.141부터 deprecated입니다.
+    # (pydantic 직접 직렬화가 더 빨라져 오히려 요청마다 경고만 발생)
+    # DB의 JSON 컬럼 직렬화는 connection.py의 orjson serializer가 계속 담당합니다.
 )
 
 # ----------------------------------------------------
@@ -76,6 +109,14 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 # ----------------------------------------------------
 app.include_router(dream_router, prefix="/api") # /api/{endpoint} 형태로 접근
 
+# ----------------------------------------------------
+# 생성된 이미지 정적 서빙
+# OpenAI 이미지 URL은 곧 만료되므로 로컬에 저장된 사본을 고정 URL로 제공합니다.
+# 파일명이 UUID라 내용이 바뀌지 않으므로 브라우저/프록시 캐싱에 안전합니다.
+# ----------------------------------------------------
+os.makedirs(settings.GENERATED_IMAGE_DIR, exist_ok=True)
+app.mount("/static/images", StaticFiles(directory=settings.GENERATED_IMAGE_DIR), name="generated_images")
+
 # ----------------------------------------------------
 # 루트 엔드포인트
 # ----------------------------------------------------
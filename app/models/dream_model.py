@@ -1,15 +1,11 @@
 # app/models/dream_model.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, JSON
-from sqlalchemy.orm import declarative_base # SQLAlchemy 1.4+ (declarative_base)
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime, func, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB # Postgres에서는 네이티브 JSONB 사용
 
-# Base는 connection.py에서 import하여 사용하므로, 여기서 선언하지 않습니다.
-# from app.database.connection import Base
-# 하지만 models 폴더가 connection.py보다 먼저 임포트될 수 있으므로,
-# model_base를 여기서 먼저 선언하고 connection.py에서 재할당하는 방식으로 해결합니다.
-# 또는 Base를 connection.py에서만 정의하고, 여기서 import 하는 방식도 가능합니다.
-# 여기서는 Base를 connection.py에서 가져오는 것으로 가정합니다.
-# 임시로 여기서 Base를 정의하여 구문 에러를 피할 수 있도록 합니다.
-Base = declarative_base()
+# Base는 connection.py에서 선언한 단 하나의 인스턴스를 공유해야 합니다.
+# 이 파일에서 별도의 declarative_base()를 만들면 메타데이터가 분리되어
+# main.py의 Base.metadata.create_all이 이 테이블을 생성하지 못합니다.
+from ..database.connection import Base
 
 
 class DreamSession(Base):
@@ -18,17 +14,41 @@ class DreamSession(Base):
     id = Column(Integer, primary_key=True, index=True) # 세션 ID (기본 키)
     dream_text = Column(Text, nullable=False) # 사용자가 말한 꿈 내용 텍스트
 
+    # 백그라운드 분석 작업의 진행 상태 (pending | running | done | error)
+    # /analyze, /irt가 202를 반환한 뒤 클라이언트는 이 값을 폴링하여 완료를 확인합니다.
+    status = Column(String, nullable=False, default="pending")
+
     # JSON 타입을 사용하여 분석 결과 저장 (DB 종류에 따라 적절한 JSON 타입 사용)
-    # SQLAlchemy의 JSON 타입은 DB별로 다르게 매핑됩니다 (SQLite는 Text, PostgreSQL은 JSONB 등)
-    analysis_results = Column(JSON, nullable=True)
-    irt_results = Column(JSON, nullable=True)
+    # SQLite에서는 일반 JSON(TEXT), Postgres에서는 네이티브 JSONB로 매핑되어
+    # 연산자(||) 기반의 원자적 배열 append와 GIN 인덱싱이 가능합니다.
+    analysis_results = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    irt_results = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
 
     # 생성된 이미지 URL 목록 (JSON 배열 형태 예: [{"original": "url", "healing": "url"}])
-    generated_images = Column(JSON, nullable=True)
+    generated_images = Column(
+        JSON().with_variant(JSONB(), "postgresql"),
+        nullable=True,
+        server_default=text("'[]'"),
+    )
+
+    __table_args__ = (
+        # Postgres에서 generated_images 내부를 조건 검색할 때를 위한 GIN 인덱스
+        Index(
+            "ix_dream_sessions_generated_images_gin",
+            "generated_images",
+            postgresql_using="gin",
+        ),
+    )
 
     created_at = Column(DateTime, default=func.now()) # 생성 시간
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now()) # 업데이트 시간
 
+    # created_at/updated_at(SQL 표현식 default)과 generated_images(server_default)를
+    # INSERT..RETURNING으로 flush 시점에 바로 채웁니다. 이 설정이 없으면 해당
+    # 속성이 만료 상태로 남아, 응답 직렬화의 속성 접근이 동기 lazy load를
+    # 유발해 AsyncSession에서 MissingGreenlet 오류가 납니다.
+    __mapper_args__ = {"eager_defaults": True}
+
     # 객체 출력 시 식별 용이
     def __repr__(self):
         return f"<DreamSession(id={self.id}, dream_text='{self.dream_text[:30]}...')>"
\ No newline at end of file
@@ -1,5 +1,9 @@
 # app/pipelines/dream_pipeline.py
-from typing import Dict, Any, Tuple
+import asyncio # STAGE 3/4 이미지 생성을 동시에 실행하기 위해 임포트
+import logging # 로그 레벨 확인(isEnabledFor)에 사용
+import hashlib # 캐시 키 생성을 위한 해시
+from collections import OrderedDict # LRU 방식의 간단한 캐시 구현에 사용
+from typing import AsyncIterator, Dict, Any, Tuple
 # 서비스 클래스들을 임포트합니다.
 from ..services.audio_service import AudioService
 from ..services.analysis_service import AnalysisService
@@ -9,6 +13,43 @@ from ..utils.exceptions import ServiceException
 
 logger = get_logger(__name__)
 
+# ----------------------------------------------------
+# 프롬프트 캐시 (프로세스 전역)
+# 동일한 dream_text로 /analyze, /irt가 반복 호출될 때 5~30초짜리
+# LLM 분석 + DALL-E 생성을 다시 수행하지 않도록 결과를 재사용합니다.
+# 파이프라인 인스턴스는 요청마다 새로 생성되므로 캐시는 모듈 레벨에 둡니다.
+# ----------------------------------------------------
+_CACHE_MAX_ENTRIES = 256 # 캐시가 무한히 커지지 않도록 LRU로 제한
+
+_analysis_cache: "OrderedDict[str, Tuple[Dict[str, Any], str, str]]" = OrderedDict()
+_irt_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# OpenAI 호출의 동시성 제한은 서비스 계층(app/core/rate_limits.py의
+# 모델별 세마포어)에서 일괄 적용되므로 파이프라인은 별도 제한을 두지 않습니다.
+
+
+def _cache_key(dream_text: str) -> str:
+    """공백을 정규화한 꿈 텍스트의 SHA-256 해시를 캐시 키로 사용합니다."""
+    normalized = " ".join(dream_text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _cache_get(cache: OrderedDict, key: str):
+    """캐시 조회. 적중 시 해당 항목을 최신으로 갱신(LRU)합니다."""
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    return None
+
+
+def _cache_put(cache: OrderedDict, key: str, value) -> None:
+    """캐시 저장. 최대 크기를 넘으면 가장 오래된 항목부터 제거합니다."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
 class DreamPipeline:
     def __init__(self,
                  audio_service: AudioService,
@@ -26,33 +67,143 @@ class DreamPipeline:
         - STAGE 2: 꿈 텍스트 분석 (RAG, GPT-4o)
         - STAGE 3: 분석 결과를 바탕으로 원본 이미지 생성 (DALL-E 3)
         - STAGE 4: 치유 이미지 생성 (DALL-E 3)
+
+        동일한 꿈 텍스트에 대한 결과는 프로세스 전역 캐시에서 재사용합니다.
         """
-        logger.info(f"Starting STAGE 2: Analyzing dream text (first 50 chars): '{dream_text[:50]}...'")
+        cache_key = _cache_key(dream_text)
+        cached = _cache_get(_analysis_cache, cache_key)
+        if cached is not None:
+            logger.info("Analysis cache hit for key %.12s... - skipping STAGE 2-4.", cache_key)
+            return cached
+
+        logger.info("Starting STAGE 2: Analyzing dream text (first 50 chars): '%.50s...'", dream_text)
         analysis_results = await self.analysis_service.analyze_dream(dream_text)
-        logger.debug(f"Analysis Results received: {analysis_results}")
+        # 분석 결과 dict 전체의 문자열 변환은 비싸므로 DEBUG가 켜진 경우에만 수행합니다.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Analysis Results received: %s", analysis_results)
 
         # 분석 결과에서 이미지 생성 프롬프트 추출 또는 기본값 사용
         original_image_prompt = analysis_results.get("image_prompt_original", f"A vivid surreal image representing the dream: {dream_text[:100]}...")
         healing_image_prompt = analysis_results.get("image_prompt_healing", f"A peaceful, positive and healing image related to the dream: {dream_text[:100]}...")
 
-        logger.info(f"Starting STAGE 3: Generating original image with prompt: '{original_image_prompt[:100]}...'")
-        original_image_url = await self.image_service.generate_image(original_image_prompt)
-        logger.info(f"Original image URL: {original_image_url}")
-
-        logger.info(f"Starting STAGE 4: Generating healing image with prompt: '{healing_image_prompt[:100]}...'")
-        healing_image_url = await self.image_service.generate_healing_image(healing_image_prompt)
-        logger.info(f"Healing image URL: {healing_image_url}")
+        # STAGE 3와 STAGE 4는 서로 데이터 의존성이 없는 독립적인 HTTP 호출이므로
+        # TaskGroup으로 동시에 실행하여 대기 시간을 절반으로 줄입니다.
+        # 한쪽이 실패하면 TaskGroup이 나머지 작업을 취소합니다.
+        logger.info("Starting STAGE 3+4 concurrently: original prompt '%.100s...', healing prompt '%.100s...'", original_image_prompt, healing_image_prompt)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                original_task = tg.create_task(self.image_service.generate_image(original_image_prompt))
+                healing_task = tg.create_task(self.image_service.generate_image(healing_image_prompt))
+        except* Exception as eg:
+            # 기존 호출부/테스트는 ServiceException 단일 예외를 기대하므로
+            # ExceptionGroup을 풀어 첫 번째 예외를 전파합니다.
+            # 서비스 계층 예외가 아닌 경우에는 ServiceException으로 감싸서
+            # 파이프라인 바깥에 일관된 예외 타입을 보장합니다.
+            first = eg.exceptions[0]
+            if isinstance(first, ServiceException):
+                raise first
+            raise ServiceException(f"Image generation stage failed: {first}")
+        original_image_url = original_task.result()
+        healing_image_url = healing_task.result()
+        logger.info("Original image URL: %s", original_image_url)
+        logger.info("Healing image URL: %s", healing_image_url)
 
+        # 모든 스테이지가 성공한 경우에만 캐시에 저장합니다.
+        _cache_put(_analysis_cache, cache_key, (analysis_results, original_image_url, healing_image_url))
         return analysis_results, original_image_url, healing_image_url
 
+    async def run_analysis_and_image_stages_stream(self, dream_text: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        run_analysis_and_image_stages의 스트리밍 변형입니다.
+        STAGE 2의 부분 분석 결과를 {"type": "analysis", "data": ...} 이벤트로
+        순서대로 yield하고, 마지막에 {"type": "result", "data": ...} 이벤트로
+        완성된 결과(분석 + 두 이미지 URL)를 yield합니다.
+
+        image_prompt_original 필드는 다음 필드(image_prompt_healing)가 스트림에
+        나타난 순간 완성된 것이므로, STAGE 2가 끝나기를 기다리지 않고 그 즉시
+        STAGE 3 이미지 생성을 시작하여 LLM 생성 꼬리와 중첩시킵니다.
+        """
+        cache_key = _cache_key(dream_text)
+        cached = _cache_get(_analysis_cache, cache_key)
+        if cached is not None:
+            logger.info("Analysis cache hit for key %.12s... - streaming cached result.", cache_key)
+            analysis_results, original_image_url, healing_image_url = cached
+            yield {"type": "analysis", "data": analysis_results}
+            yield {"type": "result", "data": {
+                "analysis_results": analysis_results,
+                "original_image_url": original_image_url,
+                "healing_image_url": healing_image_url,
+            }}
+            return
+
+        logger.info("Starting streaming STAGE 2: Analyzing dream text (first 50 chars): '%.50s...'", dream_text)
+        original_task = None
+        healing_task = None
+        analysis_results: Dict[str, Any] = {}
+        try:
+            async for partial in self.analysis_service.analyze_dream_stream(dream_text):
+                analysis_results = partial
+                if (original_task is None
+                        and "image_prompt_healing" in partial
+                        and partial.get("image_prompt_original")):
+                    logger.info("Original image prompt complete mid-stream - starting STAGE 3 early.")
+                    original_task = asyncio.create_task(
+                        self.image_service.generate_image(partial["image_prompt_original"])
+                    )
+                yield {"type": "analysis", "data": partial}
+
+            original_image_prompt = analysis_results.get("image_prompt_original", f"A vivid surreal image representing the dream: {dream_text[:100]}...")
+            healing_image_prompt = analysis_results.get("image_prompt_healing", f"A peaceful, positive and healing image related to the dream: {dream_text[:100]}...")
+            if original_task is None:
+                original_task = asyncio.create_task(
+                    self.image_service.generate_image(original_image_prompt)
+                )
+            healing_task = asyncio.create_task(
+                self.image_service.generate_image(healing_image_prompt)
+            )
+            results = await asyncio.gather(original_task, healing_task, return_exceptions=True)
+        except BaseException:
+            # 스트림 도중 실패하면 이미 시작된 이미지 생성 Task를 정리합니다.
+            for task in (original_task, healing_task):
+                if task is not None:
+                    task.cancel()
+            raise
+
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            first = errors[0]
+            if isinstance(first, ServiceException):
+                raise first
+            raise ServiceException(f"Image generation stage failed: {first}")
+        original_image_url, healing_image_url = results
+        logger.info("Original image URL: %s", original_image_url)
+        logger.info("Healing image URL: %s", healing_image_url)
+
+        _cache_put(_analysis_cache, cache_key, (analysis_results, original_image_url, healing_image_url))
+        yield {"type": "result", "data": {
+            "analysis_results": analysis_results,
+            "original_image_url": original_image_url,
+            "healing_image_url": healing_image_url,
+        }}
+
     async def run_irt_stage(self, dream_text: str, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         """
         IRT(Imagery Rescripting Therapy) 분석 스테이지 (STAGE 5)를 실행합니다.
         - STAGE 5: IRT 분석 수행
+
+        동일한 꿈 텍스트에 대한 IRT 결과도 프로세스 전역 캐시에서 재사용합니다.
         """
-        logger.info(f"Starting STAGE 5: Performing IRT analysis for text (first 50 chars): '{dream_text[:50]}...'")
+        cache_key = _cache_key(dream_text)
+        cached = _cache_get(_irt_cache, cache_key)
+        if cached is not None:
+            logger.info("IRT cache hit for key %.12s... - skipping STAGE 5.", cache_key)
+            return cached
+
+        logger.info("Starting STAGE 5: Performing IRT analysis for text (first 50 chars): '%.50s...'", dream_text)
         irt_results = await self.analysis_service.perform_irt(dream_text, analysis_results)
-        logger.debug(f"IRT Results received: {irt_results}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("IRT Results received: %s", irt_results)
+        _cache_put(_irt_cache, cache_key, irt_results)
         return irt_results
 
     # STAGE 1 (음성-텍스트 변환)은 API 라우터에서 audio_service를 직접 호출하도록 설계되어 있습니다.
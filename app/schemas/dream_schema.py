@@ -1,10 +1,27 @@
 # app/schemas/dream_schema.py
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter
 from typing import List, Dict, Any, Optional
 from datetime import datetime # datetime 객체를 위한 임포트
 
 # Pydantic 모델은 FastAPI의 요청/응답 유효성 검사 및 문서화에 사용됩니다.
 
+# 공개 스키마 표면을 명시적으로 선언합니다.
+# (와일드카드 임포트 시 의도하지 않은 심볼이 노출되는 것을 방지)
+__all__ = [
+    "DreamSessionCreate",
+    "DreamAnalysisResult",
+    "IrtRescriptingSuggestion",
+    "IrtAnalysisResult",
+    "DreamAnalysisResponse",
+    "IrtAnalysisResponse",
+    "AnalysisJobAcceptedResponse",
+    "DreamSessionResponse",
+    "DREAM_RESULT_ADAPTER",
+    "IRT_RESULT_ADAPTER",
+    "DREAM_RESULT_JSON_SCHEMA",
+    "IRT_RESULT_JSON_SCHEMA",
+]
+
 class DreamSessionCreate(BaseModel):
     """
     새로운 꿈 세션을 생성하기 위한 요청 모델 (현재는 음성 파일로 생성하므로 직접 사용되지는 않음).
@@ -57,15 +74,29 @@ class IrtAnalysisResponse(BaseModel):
     session_id: int = Field(..., description="해당 IRT 분석이 속한 세션의 고유 ID")
     irt_results: IrtAnalysisResult = Field(..., description="IRT 분석 결과")
 
+class AnalysisJobAcceptedResponse(BaseModel):
+    """
+    분석/IRT 작업 접수(202 Accepted) 응답 모델.
+    클라이언트는 poll_url을 폴링하여 status가 'done'이 되면 결과를 조회합니다.
+    """
+    session_id: int = Field(..., description="작업이 접수된 세션의 고유 ID")
+    status: str = Field(..., description="작업 상태 (pending | running | done | error)")
+    poll_url: str = Field(..., description="작업 상태와 결과를 확인할 수 있는 폴링 URL")
+
 class DreamSessionResponse(BaseModel):
     """
     꿈 분석 세션 정보를 나타내는 응답 모델 (데이터베이스 모델과 직접 매핑).
+    JSON 컬럼 필드는 DB에 저장된 그대로(dict/str)를 model_construct로 싣기 때문에
+    DreamAnalysisResult 같은 모델 타입으로 선언하면 직렬화 시마다
+    PydanticSerializationUnexpectedValue 경고가 발생합니다. 실제로 담기는
+    형태(dict)로 선언합니다. (구조 검증은 쓰기 경로의 TypeAdapter가 담당)
     """
     id: int = Field(..., description="꿈 분석 세션의 고유 ID")
     dream_text: str = Field(..., description="사용자가 말한 꿈 텍스트")
-    analysis_results: Optional[DreamAnalysisResult] = Field(None, description="꿈 심층 분석 결과 (분석 전에는 None)")
-    irt_results: Optional[IrtAnalysisResult] = Field(None, description="IRT 분석 결과 (IRT 수행 전에는 None)")
-    generated_images: List[Dict[str, HttpUrl]] = Field([], description="생성된 이미지 URL 목록 (예: [{'original': 'url', 'healing': 'url'}])")
+    status: str = Field("pending", description="백그라운드 분석 작업 상태 (pending | running | done | error)")
+    analysis_results: Optional[Dict[str, Any]] = Field(None, description="꿈 심층 분석 결과 (분석 전에는 None, 구조는 DreamAnalysisResult 참조)")
+    irt_results: Optional[Dict[str, Any]] = Field(None, description="IRT 분석 결과 (IRT 수행 전에는 None, 구조는 IrtAnalysisResult 참조)")
+    generated_images: List[Dict[str, str]] = Field([], description="생성된 이미지 URL 목록 (예: [{'original': 'url', 'healing': 'url'}])")
     created_at: datetime = Field(..., description="세션 생성 시간")
     updated_at: datetime = Field(..., description="세션 마지막 업데이트 시간")
 
@@ -73,4 +104,18 @@ class DreamSessionResponse(BaseModel):
     # Pydantic v2에서는 `orm_mode = True` 대신 `from_attributes = True`를 사용합니다.
     model_config = {
         "from_attributes": True # Pydantic v2 방식
-    }
\ No newline at end of file
+    }
+
+# ----------------------------------------------------
+# 모듈 레벨에서 한 번만 만들어 두는 TypeAdapter / JSON 스키마
+# TypeAdapter 생성과 json_schema() 계산은 비싸므로(내부 core schema 빌드),
+# 핫 패스에서 매번 만들지 않고 여기서 재사용합니다.
+# 어댑터는 쓰기 경로(dream_routes의 결과 저장)에서 LLM 출력 구조를
+# 검증하는 데 사용되며, 읽기 경로는 이를 믿고 model_construct로 건너뜁니다.
+# ----------------------------------------------------
+DREAM_RESULT_ADAPTER: TypeAdapter[DreamAnalysisResult] = TypeAdapter(DreamAnalysisResult)
+IRT_RESULT_ADAPTER: TypeAdapter[IrtAnalysisResult] = TypeAdapter(IrtAnalysisResult)
+
+# 구조화 출력 체인(with_structured_output)에 넘기는 JSON 스키마 (한 번만 계산)
+DREAM_RESULT_JSON_SCHEMA = DREAM_RESULT_ADAPTER.json_schema()
+IRT_RESULT_JSON_SCHEMA = IRT_RESULT_ADAPTER.json_schema()
\ No newline at end of file
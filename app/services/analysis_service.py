@@ -1,29 +1,266 @@
 # app/services/analysis_service.py
+import asyncio
+import hashlib # 캐시 키 생성을 위한 해시
+import os # CAG 코퍼스 로딩에 사용
+import math # 코사인 유사도 계산에 사용
+import time # TTL 캐시의 만료 시각 계산에 사용
+from collections import OrderedDict # LRU + TTL 캐시 구현에 사용
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.runnables import RunnablePassthrough
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 import json
 
 from ..core.settings import settings # 설정 정보 로드
+from ..schemas.dream_schema import DREAM_RESULT_JSON_SCHEMA, IRT_RESULT_JSON_SCHEMA # 구조화 출력 스키마 (모듈 로드 시 한 번 계산)
+from ..core.http_client import HTTP_CLIENT # 공유 HTTP 클라이언트 (keep-alive + HTTP/2)
+from ..core.rate_limits import GPT4O_SEMAPHORE # GPT-4o 동시 호출 상한
 from ..utils.logger import get_logger # 로깅을 위해 임포트
 from ..utils.exceptions import AIModelException, ServiceException # 커스텀 예외
 
 logger = get_logger(__name__)
 
+# LangChain 전역 LLM 캐시는 프로세스당 한 번만 설정합니다.
+_llm_cache_configured = False
+
+
+def _configure_llm_cache() -> None:
+    """
+    동일한 LLM 프롬프트가 다시 들어오면 (프로세스 재시작 이후 포함)
+    API 호출 없이 결과를 재사용하도록 SQLite 기반 전역 캐시를 설정합니다.
+    """
+    global _llm_cache_configured
+    if _llm_cache_configured:
+        return
+    try:
+        from langchain_core.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+        set_llm_cache(SQLiteCache(database_path=".langchain.db"))
+        _llm_cache_configured = True
+        logger.info("LangChain SQLite LLM cache configured (.langchain.db).")
+    except Exception as e:
+        logger.warning("Failed to configure LangChain LLM cache (continuing without it): %s", e)
+
+
+def _build_cached_embeddings(base: OpenAIEmbeddings):
+    """
+    임베딩 호출을 디스크 캐시(LocalFileStore)로 감쌉니다.
+    같은 텍스트를 다시 임베딩하면 OpenAI API 호출(~100-300ms) 없이
+    캐시에서 벡터를 읽어오며, 캐시는 프로세스 재시작 후에도 유지됩니다.
+    설정에 실패하면 캐시 없이 원본 임베딩을 그대로 사용합니다.
+    """
+    try:
+        try:
+            # langchain 0.x 경로
+            from langchain.embeddings import CacheBackedEmbeddings
+            from langchain.storage import LocalFileStore
+        except ImportError:
+            # langchain 1.x에서는 레거시 API가 langchain_classic으로 이동
+            from langchain_classic.embeddings import CacheBackedEmbeddings
+            from langchain_classic.storage import LocalFileStore
+
+        store = LocalFileStore(settings.EMBED_CACHE_DIR)
+        cached = CacheBackedEmbeddings.from_bytes_store(
+            base,
+            store,
+            # 모델이 바뀌면 캐시 키도 달라지도록 모델명을 네임스페이스로 사용
+            namespace=getattr(base, "model", "openai-embeddings"),
+            query_embedding_cache=True, # 검색 쿼리(aembed_query)도 캐시
+        )
+        logger.info(f"Embedding cache configured at {settings.EMBED_CACHE_DIR}.")
+        return cached
+    except Exception as e:
+        logger.warning("Failed to configure embedding cache (continuing without it): %s", e)
+        return base
+
+
+def _load_vectorstore(embeddings):
+    """
+    RAG 검색용 벡터 스토어를 로드합니다.
+    소규모 코퍼스에는 인메모리 FAISS 인덱스(쿼리당 sqlite 오버헤드 없이
+    서브밀리초 top-k, 읽기 전용 스레드 안전)를 우선 사용하고, 인덱스가
+    없거나 faiss가 설치되지 않은 환경에서는 기존 ChromaDB로 폴백합니다.
+    인덱스는 scrips/build_rag_db.py가 생성합니다.
+    """
+    try:
+        from langchain_community.vectorstores import FAISS
+        if os.path.isdir(settings.FAISS_INDEX_PATH):
+            store = FAISS.load_local(
+                settings.FAISS_INDEX_PATH,
+                embeddings,
+                # 우리가 직접 빌드한 로컬 인덱스이므로 역직렬화를 허용합니다.
+                allow_dangerous_deserialization=True,
+            )
+            logger.info(f"FAISS index loaded from {settings.FAISS_INDEX_PATH}.")
+            return store
+        logger.info(f"FAISS index not found at {settings.FAISS_INDEX_PATH} - falling back to ChromaDB.")
+    except Exception as e:
+        logger.warning("Failed to load FAISS index (falling back to ChromaDB): %s", e)
+    return Chroma(
+        persist_directory=settings.CHROMA_DB_PATH,
+        embedding_function=embeddings
+    )
+
+
+def _load_cag_corpus() -> Optional[str]:
+    """
+    CAG(Cache-Augmented Generation)용 코퍼스를 로드합니다.
+    지식 베이스 전체가 토큰 상한 이내이면 합쳐진 텍스트를 반환하고,
+    비어 있거나 너무 크면 None을 반환하여 기존 RAG 경로를 사용하게 합니다.
+    파일은 정렬된 순서로 합쳐 접두사가 항상 바이트 단위로 동일하도록 합니다.
+    """
+    try:
+        base_path = settings.KNOWLEDGE_BASE_PATH
+        if not os.path.isdir(base_path):
+            return None
+        parts: List[str] = []
+        for filename in sorted(os.listdir(base_path)):
+            if filename.endswith(".txt") and not filename.startswith("."):
+                with open(os.path.join(base_path, filename), encoding="utf-8") as f:
+                    text = f.read().strip()
+                if text:
+                    parts.append(text)
+        corpus = "\n\n".join(parts)
+        if not corpus:
+            return None
+        try:
+            import tiktoken
+            n_tokens = len(tiktoken.encoding_for_model("gpt-4o").encode(corpus))
+        except Exception:
+            n_tokens = len(corpus) // 2 # 한국어 기준 보수적 근사치
+        if n_tokens > settings.CAG_MAX_CORPUS_TOKENS:
+            logger.info(f"Corpus too large for CAG ({n_tokens} tokens) - keeping RAG retrieval.")
+            return None
+        logger.info(f"CAG enabled: {n_tokens}-token corpus embedded in the static system prompt.")
+        return corpus
+    except Exception as e:
+        logger.warning("Failed to load corpus for CAG (falling back to RAG): %s", e)
+        return None
+
+
+# ----------------------------------------------------
+# 정적 시스템 프롬프트 (모듈 레벨 상수)
+# 스키마/지침처럼 요청마다 변하지 않는 부분은 바이트 단위로 동일한 접두사로
+# 유지해야 OpenAI의 자동 프롬프트 prefix 캐시가 적중합니다.
+# 변수({dream_text}, {context})는 반드시 마지막 human 턴에만 둡니다.
+# 템플릿 변수 해석을 피하기 위해 SystemMessage로 감싸므로 JSON 중괄호를
+# 이스케이프 없이 그대로 쓸 수 있습니다.
+# ----------------------------------------------------
+# 응답 JSON의 구조와 각 필드 설명은 서버 측 구조화 출력(json_schema)으로
+# 강제되므로 프롬프트에 형식 설명을 중복해서 넣지 않습니다.
+# (입력 토큰이 줄고 접두사 캐시 적중에도 유리합니다.)
+_ANALYSIS_SYSTEM_PROMPT = """당신은 심리학 및 꿈 분석 전문가입니다. 제공된 꿈 텍스트와 관련 심리학 지식을 바탕으로 심층적인 분석을 수행합니다.
+응답은 한국어로 작성하되, 이미지 생성 프롬프트(image_prompt_original, image_prompt_healing)는 영어로 작성해주세요.
+image_prompt_healing은 그 자체로 평화롭고 긍정적이며 희망적인, 치유적인 분위기가 완결되게 작성해주세요."""
+
+_IRT_SYSTEM_PROMPT = """당신은 인지행동치료(CBT) 및 심상 재구성 치료(IRT) 전문가입니다. 제공된 꿈 분석 결과와 원본 꿈 텍스트를 바탕으로,
+사용자가 부정적인 꿈 이미지를 긍정적으로 재구성할 수 있도록 돕는 구체적인 가이드와 제안을 제공합니다.
+응답은 한국어로 작성해주세요."""
+
+# ----------------------------------------------------
+# 분석 결과 캐시 (프로세스 전역)
+# L1: dream_text의 SHA-256 정확 일치 (TTL 1시간, LRU 제한)
+# L2: 임베딩 코사인 유사도 기반 시맨틱 캐시 — 사용자가 거의 같은 꿈을
+#     다시 말하면(예: "하늘을 나는 꿈") LLM 호출 없이 기존 분석을 재사용
+# ----------------------------------------------------
+_L1_MAX_ENTRIES = 1024
+_L1_TTL_SECONDS = 3600.0
+_SEMANTIC_MAX_ENTRIES = 512
+_SEMANTIC_THRESHOLD = 0.92 # 이 값 이상의 코사인 유사도면 같은 꿈으로 간주
+
+_analysis_l1: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_irt_l1: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+# (임베딩 벡터, 분석 결과) 쌍의 목록 — 작은 상한이라 선형 탐색으로 충분합니다.
+_semantic_entries: "List[Tuple[List[float], Dict[str, Any]]]" = []
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# IRT 입력 정준화에서 제거할 휘발성 키 — 분석 의미와 무관하게 값이 매번
+# 달라질 수 있는 필드가 섞이면 캐시 키와 프롬프트 접두사가 계속 바뀝니다.
+_VOLATILE_ANALYSIS_KEYS = frozenset({"session_id", "created_at", "updated_at", "timestamp"})
+
+
+def _canonicalize_analysis(analysis_results: Dict[str, Any]) -> str:
+    """
+    IRT 프롬프트에 들어가는 분석 결과 JSON을 정준화합니다.
+    키 정렬 + 공백 없는 구분자 + 휘발성 필드 제거로, 의미가 같은 분석이면
+    LLM 출력의 키 순서가 달라도 항상 바이트 단위로 동일한 문자열이 되어
+    IRT의 L1 캐시 키와 OpenAI 프롬프트 prefix 캐시가 안정적으로 적중합니다.
+    """
+    stable = {k: v for k, v in analysis_results.items() if k not in _VOLATILE_ANALYSIS_KEYS}
+    return json.dumps(stable, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _l1_get(cache: OrderedDict, key: str) -> Optional[Dict[str, Any]]:
+    """TTL이 지나지 않은 항목만 반환하고, 적중 시 LRU 순서를 갱신합니다."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if time.monotonic() >= expires_at:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return value
+
+
+def _l1_put(cache: OrderedDict, key: str, value: Dict[str, Any]) -> None:
+    cache[key] = (time.monotonic() + _L1_TTL_SECONDS, value)
+    cache.move_to_end(key)
+    while len(cache) > _L1_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
+def _cosine_similarity(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _semantic_get(query_vec: List[float]) -> Optional[Dict[str, Any]]:
+    """시맨틱 캐시에서 가장 유사한 항목을 찾고, 임계값 이상이면 반환합니다."""
+    best_score, best_value = 0.0, None
+    for vec, value in _semantic_entries:
+        score = _cosine_similarity(query_vec, vec)
+        if score > best_score:
+            best_score, best_value = score, value
+    if best_value is not None and best_score >= _SEMANTIC_THRESHOLD:
+        logger.info(f"Semantic cache hit (cosine={best_score:.3f}) - reusing cached analysis.")
+        return best_value
+    return None
+
+
+def _semantic_put(query_vec: List[float], value: Dict[str, Any]) -> None:
+    _semantic_entries.append((query_vec, value))
+    while len(_semantic_entries) > _SEMANTIC_MAX_ENTRIES:
+        _semantic_entries.pop(0)
+
+
+# ----------------------------------------------------
+# 선(先)검색 Task 레지스트리
+# STT가 끝나는 즉시(/sessions 응답 전) Chroma 검색을 미리 시작해 두면,
+# 곧이어 들어오는 /analyze 요청은 이미 진행 중이거나 끝난 검색 결과를
+# 재사용하여 검색 지연을 임계 경로에서 제거할 수 있습니다.
+# ----------------------------------------------------
+_PREFETCH_MAX_ENTRIES = 64
+
+_pending_context: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
 class AnalysisService:
     def __init__(self):
         # OpenAI 임베딩 모델 초기화 (ChromaDB 로드 및 RAG 검색에 사용)
-        self.embeddings = OpenAIEmbeddings(openai_api_key=settings.OPENAI_API_KEY)
-
-        # ChromaDB 벡터 스토어 로드 (persist_directory에서 기존 DB 로드)
-        # build_rag_db.py 스크립트가 먼저 실행되어 DB가 생성되어 있어야 합니다.
-        self.vectorstore = Chroma(
-            persist_directory=settings.CHROMA_DB_PATH,
-            embedding_function=self.embeddings
+        # 디스크 캐시로 감싸 동일 텍스트의 재임베딩 API 호출을 제거합니다.
+        self.embeddings = _build_cached_embeddings(
+            OpenAIEmbeddings(openai_api_key=settings.OPENAI_API_KEY)
         )
+
+        # 벡터 스토어 로드 (FAISS 인덱스 우선, 없으면 ChromaDB 폴백)
+        # build_rag_db.py 스크립트가 먼저 실행되어 인덱스가 생성되어 있어야 합니다.
+        self.vectorstore = _load_vectorstore(self.embeddings)
         # 리트리버 설정: 벡터 DB에서 관련 문서를 검색하는 역할
         self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 3}) # 상위 3개 문서 검색
 
@@ -31,28 +268,34 @@ class AnalysisService:
         self.llm = ChatOpenAI(
             model="gpt-4o", # 사용할 OpenAI LLM 모델
             temperature=0.7, # 창의성 조절 (0.0: 보수적, 1.0: 창의적)
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            http_async_client=HTTP_CLIENT, # 공유 HTTP 클라이언트로 연결 재사용
+            max_retries=settings.OPENAI_MAX_RETRIES # 429/일시 오류는 지수 백오프로 재시도
         )
 
+        # 동일 프롬프트 재호출을 흡수하는 전역 LLM 캐시 (재시작에도 유지)
+        _configure_llm_cache()
+
         # ----------------------------------------------------
         # 꿈 분석을 위한 LangChain 프롬프트 정의
+        # [정적 system, 변수는 마지막 human 턴] 순서를 유지하여
+        # 요청 간 프롬프트 접두사가 바이트 단위로 동일하도록 합니다.
         # ----------------------------------------------------
+        # 코퍼스가 충분히 작으면 CAG: 전체 코퍼스를 고정 시스템 접두사에 포함하여
+        # 검색/임베딩 단계를 완전히 생략합니다. 코퍼스 토큰은 OpenAI의 자동
+        # 프롬프트 prefix 캐시가 서버 측에서 재사용하므로 매 요청 재과금/재처리가
+        # 크게 줄어듭니다. 코퍼스가 없거나 크면 기존 RAG 경로를 유지합니다.
+        self._cag_corpus = _load_cag_corpus()
+        if self._cag_corpus is not None:
+            analysis_system = SystemMessage(
+                content=f"{_ANALYSIS_SYSTEM_PROMPT}\n\n[참고 심리학 지식 전문]\n{self._cag_corpus}"
+            )
+            analysis_human = ("human", "꿈 텍스트: {dream_text}")
+        else:
+            analysis_system = SystemMessage(content=_ANALYSIS_SYSTEM_PROMPT) # 변수 없는 고정 접두사
+            analysis_human = ("human", "꿈 텍스트: {dream_text}\n관련 지식: {context}")
         self.analysis_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", """당신은 심리학 및 꿈 분석 전문가입니다. 제공된 꿈 텍스트와 관련 심리학 지식을 바탕으로 심층적인 분석을 수행합니다.
-                다음 JSON 형식으로 응답해주세요:
-                {
-                    "summary": "꿈의 핵심 내용 요약",
-                    "keywords": ["주요 키워드1", "주요 키워드2", "..."],
-                    "symbolism_analysis": "꿈의 주요 상징에 대한 심리학적 해석",
-                    "emotional_context": "꿈 속 감정 상태 및 의미 분석",
-                    "potential_implications": "꿈이 현재 삶에 시사하는 바 또는 메시지",
-                    "image_prompt_original": "이 꿈의 분위기와 핵심 요소를 담은 초현실적이거나 상징적인 이미지 생성 프롬프트 (영어)",
-                    "image_prompt_healing": "이 꿈에서 느껴지는 부정적 감정을 완화하고 긍정적이고 치유적인 분위기를 담은 이미지 생성 프롬프트 (영어)"
-                }
-                """), # 여기 큰따옴표 바로 직전에 닫는 중괄호 '}'가 있는지 확인
-                ("human", "꿈 텍스트: {dream_text}\n관련 지식: {context}")
-            ]
+            [analysis_system, analysis_human]
         )
 
         # ----------------------------------------------------
@@ -60,23 +303,7 @@ class AnalysisService:
         # ----------------------------------------------------
         self.irt_prompt = ChatPromptTemplate.from_messages(
             [
-                ("system", """당신은 인지행동치료(CBT) 및 심상 재구성 치료(IRT) 전문가입니다. 제공된 꿈 분석 결과와 원본 꿈 텍스트를 바탕으로,
-                사용자가 부정적인 꿈 이미지를 긍정적으로 재구성할 수 있도록 돕는 구체적인 가이드와 제안을 제공합니다.
-                다음 JSON 형식으로 응답해주세요:
-                {
-                    "irt_explanation": "IRT에 대한 간략한 설명",
-                    "negative_elements_identified": ["원본 꿈에서 재구성할 부정적 요소1", "..."],
-                    "rescripting_suggestions": [
-                        {
-                            "element": "재구성할 요소",
-                            "original_image": "원본 꿈 속 부정적 이미지 설명",
-                            "new_image_suggestion": "새로운 긍정적 이미지에 대한 구체적인 상상 지침"
-                        },
-                        ...
-                    ],
-                    "actionable_insights": "IRT 과정을 통해 얻을 수 있는 통찰 및 실제 생활에 적용 가능한 조언"
-                }
-                """), # 여기도 큰따옴표 바로 직전에 닫는 중괄호 '}'가 있는지 확인
+                SystemMessage(content=_IRT_SYSTEM_PROMPT), # 변수 없는 고정 접두사
                 ("human", "원본 꿈 텍스트: {dream_text}\n기존 분석 결과: {analysis_results}")
             ]
         )
@@ -84,33 +311,159 @@ class AnalysisService:
         # ----------------------------------------------------
         # LangChain Chain 정의
         # ----------------------------------------------------
-        # RAG를 포함한 꿈 분석 체인
+        # 네이티브 구조화 출력(서버 측 제약 디코딩)을 사용합니다.
+        # 스키마는 기존 Pydantic 응답 모델에서 그대로 가져오므로 프롬프트의
+        # 형식 설명 없이도 첫 시도에 유효한 JSON이 보장되고(파서 재시도 제거),
+        # dict 스키마를 넘기면 내부 파서가 JsonOutputParser라 부분 JSON
+        # 스트리밍(astream)도 그대로 동작합니다.
+        # 검색(retrieval)은 체인에 묶지 않고 analyze_dream에서 명시적 단계로
+        # 실행합니다 — 이렇게 해야 검색을 Task로 미리 시작해 두고 다른 작업과
+        # 중첩시킬 수 있습니다. (STT 진행 중 선(先)검색 등)
         self.analysis_chain = (
-            {"dream_text": RunnablePassthrough(), "context": self.retriever} # dream_text를 그대로 전달하고, retriever로 context를 가져옴
-            | self.analysis_prompt
-            | self.llm
-            | JsonOutputParser() # LLM 응답을 JSON으로 파싱
+            self.analysis_prompt
+            | self.llm.with_structured_output(
+                DREAM_RESULT_JSON_SCHEMA, method="json_schema", strict=True
+            )
         )
 
         # IRT 분석 체인
         self.irt_chain = (
             self.irt_prompt
-            | self.llm
-            | JsonOutputParser() # LLM 응답을 JSON으로 파싱
+            | self.llm.with_structured_output(
+                IRT_RESULT_JSON_SCHEMA, method="json_schema", strict=True
+            )
         )
 
-    async def analyze_dream(self, dream_text: str) -> Dict[str, Any]:
+    def start_context_retrieval(self, dream_text: str) -> "asyncio.Task":
+        """
+        Chroma 검색을 백그라운드 Task로 시작하고 즉시 반환합니다.
+        호출자는 검색이 진행되는 동안 다른 작업(프롬프트 준비, STT 마무리 등)을
+        수행한 뒤, 반환된 Task를 analyze_dream에 넘겨 결과를 재사용할 수 있습니다.
+        """
+        return asyncio.create_task(self.retriever.ainvoke(dream_text))
+
+    def prefetch_context(self, dream_text: str) -> None:
+        """
+        나중에 같은 dream_text로 analyze_dream이 호출될 것을 예상하고
+        Chroma 검색을 미리 시작해 둡니다. (STT 완료 직후 호출하면 검색이
+        응답 왕복 및 클라이언트의 /analyze 호출과 중첩됩니다.)
+        결과는 모듈 레벨 레지스트리에 보관되어 analyze_dream이 재사용합니다.
+        """
+        if self._cag_corpus is not None:
+            return # CAG 경로에는 검색 단계가 없으므로 미리 시작할 것도 없습니다.
+        key = _sha256(dream_text)
+        if key in _pending_context:
+            return
+        _pending_context[key] = self.start_context_retrieval(dream_text)
+        while len(_pending_context) > _PREFETCH_MAX_ENTRIES:
+            _, stale = _pending_context.popitem(last=False)
+            stale.cancel() # 소비되지 않은 오래된 검색은 취소하여 자원을 회수
+
+    async def analyze_dream(self, dream_text: str, context_task: "asyncio.Task | None" = None) -> Dict[str, Any]:
         """
         꿈 텍스트를 분석하고 RAG를 통해 관련 심리학 지식을 통합하여 상세 분석 결과를 반환합니다.
+        context_task가 주어지면 미리 시작해 둔 검색 결과를 그대로 사용합니다.
         """
         try:
             logger.info(f"Starting dream analysis with RAG for text (first 50 chars): '{dream_text[:50]}...'")
-            # LangChain Chain을 사용하여 비동기적으로 분석 수행
-            response = await self.analysis_chain.ainvoke({"dream_text": dream_text})
+
+            # L1: dream_text 정확 일치 캐시
+            cache_key = _sha256(dream_text)
+            cached = _l1_get(_analysis_l1, cache_key)
+            if cached is not None:
+                logger.info("Analysis L1 cache hit - skipping retrieval and LLM call.")
+                return cached
+
+            # L2: 임베딩 기반 시맨틱 캐시 (임베딩 1회 비용으로 LLM 호출을 절약)
+            query_vec = None
+            try:
+                query_vec = await self.embeddings.aembed_query(dream_text)
+                cached = _semantic_get(query_vec)
+                if cached is not None:
+                    _l1_put(_analysis_l1, cache_key, cached)
+                    return cached
+            except Exception as e:
+                logger.warning("Semantic cache lookup failed (continuing without it): %s", e)
+
+            if self._cag_corpus is not None:
+                # CAG 경로: 전체 코퍼스가 이미 시스템 프롬프트에 포함되어 있으므로
+                # 검색 단계 없이 곧바로 LLM을 호출합니다.
+                if context_task is not None:
+                    context_task.cancel()
+                async with GPT4O_SEMAPHORE:
+                    response = await self.analysis_chain.ainvoke({"dream_text": dream_text})
+            else:
+                # 선검색 레지스트리에 같은 텍스트로 미리 시작해 둔 검색이 있으면 재사용합니다.
+                if context_task is None:
+                    context_task = _pending_context.pop(cache_key, None)
+                    if context_task is not None and context_task.done() and (
+                        context_task.cancelled() or context_task.exception() is not None
+                    ):
+                        context_task = None # 실패/취소된 선검색은 버리고 새로 시작
+                # 검색을 먼저 Task로 시작하여 LLM 호출 준비 작업과 중첩시킵니다.
+                if context_task is None:
+                    context_task = self.start_context_retrieval(dream_text)
+                context_docs = await context_task
+                # LangChain Chain을 사용하여 비동기적으로 분석 수행
+                async with GPT4O_SEMAPHORE:
+                    response = await self.analysis_chain.ainvoke({"dream_text": dream_text, "context": context_docs})
             logger.info("Dream analysis completed successfully.")
+
+            # 성공한 결과만 캐시에 저장합니다.
+            _l1_put(_analysis_l1, cache_key, response)
+            if query_vec is not None:
+                _semantic_put(query_vec, response)
             return response
         except Exception as e:
-            logger.error(f"Error during dream analysis: {e}", exc_info=True)
+            logger.error("Error during dream analysis: %s", e, exc_info=True)
+            raise ServiceException(f"Failed to analyze dream: {e}")
+
+    async def analyze_dream_stream(self, dream_text: str, context_task: "asyncio.Task | None" = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        analyze_dream의 스트리밍 변형입니다.
+        JsonOutputParser는 부분 JSON을 점진적으로 파싱할 수 있으므로,
+        LLM이 응답을 생성하는 동안 점점 완성되어 가는 분석 dict를 순서대로
+        yield합니다. 마지막으로 yield된 dict가 완성된 결과이며 L1 캐시에
+        저장됩니다. (첫 부분 결과는 ~0.5초 내에 도착하므로 체감 지연이
+        전체 생성 시간에서 첫 토큰 시간으로 줄어듭니다.)
+        """
+        logger.info(f"Starting streaming dream analysis for text (first 50 chars): '{dream_text[:50]}...'")
+        cache_key = _sha256(dream_text)
+        cached = _l1_get(_analysis_l1, cache_key)
+        if cached is not None:
+            logger.info("Analysis L1 cache hit - streaming cached result as a single chunk.")
+            if context_task is not None:
+                context_task.cancel()
+            yield cached
+            return
+        try:
+            if self._cag_corpus is not None:
+                # CAG 경로: 검색 단계 없이 곧바로 스트리밍을 시작합니다.
+                if context_task is not None:
+                    context_task.cancel()
+                chain_input: Dict[str, Any] = {"dream_text": dream_text}
+            else:
+                if context_task is None:
+                    context_task = _pending_context.pop(cache_key, None)
+                    if context_task is not None and context_task.done() and (
+                        context_task.cancelled() or context_task.exception() is not None
+                    ):
+                        context_task = None
+                if context_task is None:
+                    context_task = self.start_context_retrieval(dream_text)
+                chain_input = {"dream_text": dream_text, "context": await context_task}
+
+            partial: Dict[str, Any] = {}
+            async with GPT4O_SEMAPHORE:
+                async for partial in self.analysis_chain.astream(chain_input):
+                    if isinstance(partial, dict):
+                        yield partial
+
+            if isinstance(partial, dict) and partial:
+                _l1_put(_analysis_l1, cache_key, partial)
+            logger.info("Streaming dream analysis completed successfully.")
+        except Exception as e:
+            logger.error("Error during streaming dream analysis: %s", e, exc_info=True)
             raise ServiceException(f"Failed to analyze dream: {e}")
 
     async def perform_irt(self, dream_text: str, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -119,10 +472,22 @@ class AnalysisService:
         """
         try:
             logger.info(f"Starting IRT analysis for text (first 50 chars): '{dream_text[:50]}...'")
-            # analysis_results는 Dict[str, Any] 타입이므로, LLM 프롬프트에 전달하기 위해 JSON 문자열로 변환합니다.
-            response = await self.irt_chain.ainvoke({"dream_text": dream_text, "analysis_results": json.dumps(analysis_results, ensure_ascii=False)})
+            # analysis_results는 Dict[str, Any] 타입이므로, LLM 프롬프트에 전달하기 위해
+            # 정준화된 JSON 문자열로 변환합니다. (키 순서/휘발성 필드에 불변)
+            analysis_json = _canonicalize_analysis(analysis_results)
+
+            # (꿈 텍스트, 분석 결과) 쌍이 같으면 IRT 결과도 같으므로 캐시를 먼저 확인합니다.
+            cache_key = f"{_sha256(dream_text)}:{_sha256(analysis_json)}"
+            cached = _l1_get(_irt_l1, cache_key)
+            if cached is not None:
+                logger.info("IRT L1 cache hit - skipping LLM call.")
+                return cached
+
+            async with GPT4O_SEMAPHORE:
+                response = await self.irt_chain.ainvoke({"dream_text": dream_text, "analysis_results": analysis_json})
             logger.info("IRT analysis completed successfully.")
+            _l1_put(_irt_l1, cache_key, response)
             return response
         except Exception as e:
-            logger.error(f"Error during IRT analysis: {e}", exc_info=True)
+            logger.error("Error during IRT analysis: %s", e, exc_info=True)
             raise ServiceException(f"Failed to perform IRT analysis: {e}")
\ No newline at end of file
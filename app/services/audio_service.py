@@ -1,40 +1,52 @@
 # app/services/audio_service.py
 import openai # OpenAI Python SDK
 import io # 바이트 스트림 처리를 위해 필요
+from typing import BinaryIO, Optional, Union # 바이트/파일 스트림 입력을 모두 허용하기 위해 임포트
 from ..core.settings import settings # 설정 정보 로드
+from ..core.openai_client import get_openai_client # 공유 OpenAI 클라이언트 싱글턴
 from ..utils.logger import get_logger # 로깅을 위해 임포트
 from ..utils.exceptions import AIModelException, ServiceException # 커스텀 예외
 
 logger = get_logger(__name__)
 
 class AudioService:
-    def __init__(self):
-        # OpenAI API 키 설정 (settings.py에서 로드)
-        openai.api_key = settings.OPENAI_API_KEY
-        self.openai_client = openai.AsyncClient() # 비동기 OpenAI 클라이언트 초기화
+    def __init__(self, openai_client: Optional[openai.AsyncOpenAI] = None):
+        # 공유 OpenAI 클라이언트를 주입받아 연결 수립 비용을 호출 간에 상각합니다.
+        # (테스트에서는 가짜 클라이언트를 넘겨 교체할 수 있습니다.)
+        self.openai_client = openai_client or get_openai_client()
 
-    async def speech_to_text(self, audio_content: bytes) -> str:
+    async def speech_to_text(self, audio_content: Union[bytes, BinaryIO], filename: str = "dream_audio.wav") -> str:
         """
         Whisper API를 사용하여 음성 파일을 텍스트로 변환합니다.
+        audio_content는 bytes 또는 파일 객체(스트림)를 모두 허용합니다.
+        파일 객체를 전달하면 전체 내용을 메모리에 올리지 않고 httpx가 그대로 스트리밍합니다.
         """
         try:
-            # BytesIO를 사용하여 바이트 컨텐츠를 파일처럼 처리
-            audio_file = io.BytesIO(audio_content)
-            audio_file.name = "dream_audio.wav" # 파일 이름은 API 요청에 필요 (확장자도 중요)
+            if isinstance(audio_content, bytes):
+                # BytesIO를 사용하여 바이트 컨텐츠를 파일처럼 처리 (하위 호환)
+                audio_file = io.BytesIO(audio_content)
+                audio_file.name = filename # 파일 이름은 API 요청에 필요 (확장자도 중요)
+                file_param = audio_file
+            else:
+                # 이미 파일/스트림 형태라면 처음부터 읽을 수 있도록 위치만 되감습니다.
+                # SpooledTemporaryFile의 name은 3.11+에서 읽기 전용 프로퍼티라
+                # 할당할 수 없으므로, (파일명, 스트림) 튜플로 파일명을 전달합니다.
+                audio_content.seek(0)
+                file_param = (filename, audio_content)
 
             logger.info("Calling OpenAI Whisper API for STT...")
             response = await self.openai_client.audio.transcriptions.create(
                 model=settings.WHISPER_MODEL_NAME, # settings에서 모델명 로드 (예: "whisper-1")
-                file=audio_file
+                file=file_param
             )
             logger.info("STT successful.")
             return response.text
         except openai.APIStatusError as e: # OpenAI API 호출 시 발생하는 HTTP 상태 코드 에러
-            logger.error(f"OpenAI API status error during STT: {e.status_code} - {e.response}", exc_info=True)
+            logger.error("OpenAI API status error during STT: %s - %s", e.status_code, e.response, exc_info=True)
             raise AIModelException(f"OpenAI API error during STT: {e.message} (Status: {e.status_code})")
         except openai.APITimeoutError as e: # OpenAI API 호출 시 타임아웃 에러
-            logger.error(f"OpenAI API timeout during STT: {e}", exc_info=True)
+            logger.error("OpenAI API timeout during STT: %s", e, exc_info=True)
             raise AIModelException(f"OpenAI API timeout during STT.")
         except Exception as e: # 기타 예상치 못한 에러
-            logger.error(f"Unexpected error during speech-to-text conversion: {e}", exc_info=True)
+            logger.error("Unexpected error during speech-to-text conversion: %s", e, exc_info=True)
             raise ServiceException(f"Failed to convert audio to text: {e}")
\ No newline at end of file
@@ -1,47 +1,88 @@
 # app/services/image_service.py
+import os # 이미지 저장 디렉토리 생성에 사용
+import uuid # 저장 파일명 충돌 방지를 위한 고유 ID
 import openai # OpenAI Python SDK
+from typing import Optional
 from ..core.settings import settings # 설정 정보 로드
+from ..core.http_client import HTTP_CLIENT # 공유 HTTP 클라이언트 (이미지 다운로드용)
+from ..core.openai_client import get_openai_client # 공유 OpenAI 클라이언트 싱글턴
+from ..core.rate_limits import DALLE_SEMAPHORE # DALL-E 동시 호출 상한
 from ..utils.logger import get_logger # 로깅을 위해 임포트
 from ..utils.exceptions import AIModelException, ServiceException # 커스텀 예외
 
 logger = get_logger(__name__)
 
+# 두 이미지(원본/치유)가 공유하는 스타일 접두사.
+# 프롬프트 맨 앞에 동일한 문자열이 그대로 오도록 하여, 프롬프트 prefix 캐시를
+# 지원하는 프로바이더에서 두 번째 호출이 캐시 적중을 얻을 수 있게 합니다.
+# (스타일 일관성도 함께 확보됩니다.)
+STYLE_PREFIX = (
+    "A dreamlike digital illustration with soft lighting, rich detail, "
+    "and a consistent painterly style. "
+)
+
 class ImageService:
-    def __init__(self):
-        openai.api_key = settings.OPENAI_API_KEY
-        self.openai_client = openai.AsyncClient() # 비동기 OpenAI 클라이언트 초기화
+    def __init__(self, openai_client: Optional[openai.AsyncOpenAI] = None):
+        # 공유 OpenAI 클라이언트를 주입받아 API 호출과 이미지 다운로드 모두 연결을 재사용합니다.
+        # (테스트에서는 가짜 클라이언트를 넘겨 교체할 수 있습니다.)
+        self.openai_client = openai_client or get_openai_client()
+        self.http_client = HTTP_CLIENT # 이미지 다운로드용 (동일 전송 계층 공유)
+
+    async def _persist_image(self, openai_url: str) -> str:
+        """
+        OpenAI가 반환한 임시 이미지 URL(약 1시간 후 만료)에서 바이트를 내려받아
+        로컬 저장소에 영구 저장하고, 서빙 가능한 고정 URL을 반환합니다.
+        저장에 실패하면 원본 OpenAI URL을 그대로 반환합니다 (기능 저하 없이 동작).
+        """
+        try:
+            response = await self.http_client.get(openai_url)
+            response.raise_for_status()
+
+            os.makedirs(settings.GENERATED_IMAGE_DIR, exist_ok=True)
+            filename = f"{uuid.uuid4().hex}.png"
+            file_path = os.path.join(settings.GENERATED_IMAGE_DIR, filename)
+            with open(file_path, "wb") as f:
+                f.write(response.content)
+
+            permanent_url = f"{settings.PUBLIC_BASE_URL}/static/images/{filename}"
+            logger.info(f"Image persisted to {file_path}, served at {permanent_url}")
+            return permanent_url
+        except Exception as e:
+            logger.warning("Failed to persist generated image locally, falling back to OpenAI URL: %s", e)
+            return openai_url
 
     async def generate_image(self, prompt: str) -> str:
         """
-        DALL-E 3를 사용하여 주어진 프롬프트로 이미지를 생성하고 URL을 반환합니다.
+        DALL-E 3를 사용하여 주어진 프롬프트로 이미지를 생성하고,
+        로컬에 영구 저장한 뒤 만료되지 않는 URL을 반환합니다.
         """
         try:
             logger.info(f"Generating original image with prompt: '{prompt[:100]}...'")
-            response = await self.openai_client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                n=1, # 생성할 이미지 수
-                size=settings.DALL_E_IMAGE_SIZE, # settings에서 이미지 크기 로드
-                quality=settings.DALL_E_IMAGE_QUALITY # settings에서 이미지 품질 로드
-            )
-            image_url = response.data[0].url
+            # 세마포어로 DALL-E 동시 호출 수를 RPM 한도 이하로 묶습니다.
+            # (한도 내 병렬 실행은 유지, 429 재시도 폭주는 방지)
+            async with DALLE_SEMAPHORE:
+                response = await self.openai_client.images.generate(
+                    model="dall-e-3",
+                    # 공유 스타일 접두사를 항상 맨 앞에 두어 prefix 캐시 적중을 유도
+                    prompt=f"{STYLE_PREFIX}{prompt}",
+                    n=1, # 생성할 이미지 수
+                    size=settings.DALL_E_IMAGE_SIZE, # settings에서 이미지 크기 로드
+                    quality=settings.DALL_E_IMAGE_QUALITY # settings에서 이미지 품질 로드
+                )
+            image_url = await self._persist_image(response.data[0].url)
             logger.info(f"Original image generated: {image_url}")
             return image_url
         except openai.APIStatusError as e:
-            logger.error(f"OpenAI API status error during image generation: {e.status_code} - {e.response}", exc_info=True)
+            logger.error("OpenAI API status error during image generation: %s - %s", e.status_code, e.response, exc_info=True)
             raise AIModelException(f"OpenAI API error during image generation: {e.message} (Status: {e.status_code})")
         except openai.APITimeoutError as e:
-            logger.error(f"OpenAI API timeout during image generation: {e}", exc_info=True)
+            logger.error("OpenAI API timeout during image generation: %s", e, exc_info=True)
             raise AIModelException(f"OpenAI API timeout during image generation.")
         except Exception as e:
-            logger.error(f"Unexpected error generating image: {e}", exc_info=True)
+            logger.error("Unexpected error generating image: %s", e, exc_info=True)
             raise ServiceException(f"Failed to generate image: {e}")
 
-    async def generate_healing_image(self, prompt: str) -> str:
-        """
-        DALL-E 3를 사용하여 치유적인 분위기의 이미지를 생성합니다.
-        """
-        # 치유 이미지 프롬프트에 명확성을 더하기 위해 키워드를 추가합니다.
-        healing_prompt = f"A peaceful, positive, hopeful, and healing interpretation of: {prompt}"
-        logger.info(f"Generating healing image with prompt: '{healing_prompt[:100]}...'")
-        return await self.generate_image(healing_prompt)
\ No newline at end of file
+    # 치유 이미지용 별도 메서드는 제거했습니다. STAGE 2가 생성하는
+    # image_prompt_healing이 이미 치유적 분위기를 담고 있으므로, 여기서
+    # 접두사를 덧붙이면 LLM이 만든 프롬프트와 충돌하는 이중 보강이 됩니다.
+    # 치유 이미지도 generate_image를 그대로 사용합니다.
\ No newline at end of file
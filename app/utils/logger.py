@@ -1,28 +1,54 @@
 # app/utils/logger.py
+import atexit
+import functools
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from ..core.settings import settings # settings.py에서 LOG_LEVEL을 가져오기 위해 임포트
 
+# ----------------------------------------------------
+# 비동기 서버에서 StreamHandler는 로그 한 줄마다 stderr 동기 쓰기로
+# 이벤트 루프를 막습니다. 모든 로거가 레코드를 인메모리 큐에만 넣고
+# (마이크로초 단위), 실제 포맷팅과 쓰기는 백그라운드 리스너 스레드가
+# 수행하도록 QueueHandler + QueueListener로 분리합니다.
+# ----------------------------------------------------
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1) # 무제한 — put이 블록되지 않음
+_queue_handler = QueueHandler(_log_queue)
+
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+))
+
+_listener = QueueListener(_log_queue, _console_handler, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop) # 종료 시 큐에 남은 레코드를 비우고 스레드 정리
+
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
     프로젝트 전반에 걸쳐 사용될 로거 인스턴스를 반환합니다.
-    settings.py에 정의된 LOG_LEVEL을 따릅니다.
+    settings.py에 정의된 LOG_LEVEL을 따르며, 쓰기는 백그라운드 스레드에서
+    수행되므로 핫 패스의 logger 호출이 이벤트 루프를 막지 않습니다.
+    같은 이름의 재호출은 lru_cache가 흡수하여 setLevel/핸들러 검사도
+    이름당 한 번만 수행됩니다. (LOG_LEVEL을 런타임에 바꾼 경우에는
+    reset_loggers()로 캐시를 비우고 다시 구성할 수 있습니다.)
     """
     logger = logging.getLogger(name)
     logger.setLevel(settings.LOG_LEVEL.upper()) # settings에서 로깅 레벨 가져오기
 
-    # 핸들러 중복 추가 방지
+    # 핸들러 중복 추가 방지 (모든 로거가 동일한 큐 핸들러를 공유)
     if not logger.handlers:
-        # 콘솔 핸들러 (StreamHandler) 설정
-        console_handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        logger.addHandler(_queue_handler)
 
     return logger
 
+
+def reset_loggers() -> None:
+    """런타임에 LOG_LEVEL이 바뀐 경우 로거 구성을 다시 하도록 캐시를 비웁니다."""
+    get_logger.cache_clear()
+
 # 예시:
 # from app.utils.logger import get_logger
 # logger = get_logger(__name__)
-# logger.info("This is an info message.")
\ No newline at end of file
+# logger.info("This is an info message.")
@@ -1,29 +1,131 @@
 # scripts/build_rag_db.py
+import asyncio
 import os
 import sys
 # 프로젝트 루트 디렉토리를 sys.path에 추가하여 app 모듈을 임포트할 수 있도록 합니다.
 # 이 스크립트가 my_dream_project/scripts/ 폴더에서 실행된다고 가정합니다.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from langchain_community.document_loaders import TextLoader
+import openai
+from concurrent.futures import ThreadPoolExecutor # 문서 병렬 로딩에 사용
+from pathlib import Path
+from langchain_core.documents import Document
 from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+try:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+except ImportError: # 구버전 langchain 호환
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.core.settings import settings # app.core.settings에서 설정 임포트
 from app.utils.logger import get_logger # app.utils.logger에서 로거 임포트
 
 logger = get_logger(__name__)
 
+# 임베딩 API는 요청당 최대 2048개 입력을 받으므로 최대로 묶어 왕복 횟수를
+# 줄이고, 세마포어로 동시 요청 수를 제한하여 rate limit 안에서 병렬화합니다.
+_EMBED_BATCH_SIZE = 2048
+_EMBED_MAX_CONCURRENCY = 8
+
+
+def _load_documents_concurrently(file_paths):
+    """
+    텍스트 파일들을 스레드 풀에서 동시에 읽어 Document 목록으로 반환합니다.
+    파일 읽기는 GIL을 놓는 I/O 작업이라 스레드로 병렬화되며, TextLoader의
+    래퍼 계층(로더 객체 생성, 청크 iteration) 대신 Path.read_text로 바로
+    읽어 파일당 오버헤드도 줄입니다. 반환 순서는 입력 경로 순서를 따릅니다.
+    """
+    def load_one(file_path):
+        try:
+            text = Path(file_path).read_text(encoding="utf-8")
+            logger.info("Successfully loaded %s.", os.path.basename(file_path))
+            return Document(page_content=text, metadata={"source": file_path})
+        except Exception as e:
+            logger.error("Error loading %s: %s", file_path, e, exc_info=True)
+            print(f"Error loading {file_path}: {e}")
+            return None
+
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # executor.map은 입력 순서를 보존하므로 파일명 순 정렬이 유지됩니다.
+        loaded = executor.map(load_one, file_paths)
+    return [doc for doc in loaded if doc is not None]
+
+
+def _fast_split_documents(documents):
+    """
+    문단("\\n\\n") 경계를 따라 한 번의 선형 패스로 청크를 그리디하게 묶는
+    고속 스플리터입니다. RecursiveCharacterTextSplitter는 분리자 계층을
+    재귀 순회(O(N·k))하지만, 우리 코퍼스는 문단 구조가 뚜렷하므로 단일
+    패스(O(N)) 패킹으로 충분합니다. chunk_size를 넘는 초대형 문단만
+    기존 재귀 스플리터에 위임합니다.
+    """
+    chunk_size = settings.RAG_CHUNK_SIZE
+    overlap = settings.RAG_CHUNK_OVERLAP
+    fallback_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap
+    )
+
+    chunks = []
+    for doc in documents:
+        current = ""
+        for paragraph in doc.page_content.split("\n\n"):
+            if len(paragraph) > chunk_size:
+                # 초대형 문단은 문장 단위 재분할이 필요하므로 기존 스플리터에 위임
+                if current:
+                    chunks.append(Document(page_content=current, metadata=dict(doc.metadata)))
+                    current = ""
+                chunks.extend(fallback_splitter.split_documents(
+                    [Document(page_content=paragraph, metadata=dict(doc.metadata))]
+                ))
+                continue
+            candidate = f"{current}\n\n{paragraph}" if current else paragraph
+            if len(candidate) <= chunk_size:
+                current = candidate
+            else:
+                chunks.append(Document(page_content=current, metadata=dict(doc.metadata)))
+                # 검색 문맥 연속성을 위해 직전 청크의 꼬리를 overlap만큼 이어 붙입니다.
+                tail = current[-overlap:] if overlap else ""
+                current = f"{tail}\n\n{paragraph}" if tail else paragraph
+        if current:
+            chunks.append(Document(page_content=current, metadata=dict(doc.metadata)))
+    return chunks
+
+
+async def _embed_texts_in_batches(texts, model):
+    """
+    텍스트 목록을 배치 단위로 묶어 동시에 임베딩하고, 입력 순서를 유지한
+    벡터 목록을 반환합니다. 래퍼의 순차 임베딩 대비 빌드 시간이 배치 수와
+    동시성에 비례해 줄어듭니다.
+    """
+    client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=5)
+    semaphore = asyncio.Semaphore(_EMBED_MAX_CONCURRENCY)
+    batches = [texts[i:i + _EMBED_BATCH_SIZE] for i in range(0, len(texts), _EMBED_BATCH_SIZE)]
+
+    async def embed_batch(batch):
+        async with semaphore:
+            response = await client.embeddings.create(model=model, input=batch)
+            return [item.embedding for item in response.data]
+
+    try:
+        # gather는 배치 생성 순서대로 결과를 반환하므로 (텍스트, 벡터) 정렬이 유지됩니다.
+        results = await asyncio.gather(*[embed_batch(batch) for batch in batches])
+    finally:
+        await client.close()
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+
 def build_rag_database():
     """
-    'data/knowledge_base' 폴더의 텍스트 문서를 읽어 ChromaDB 벡터 저장소를 구축합니다.
+    'data/knowledge_base' 폴더의 텍스트 문서를 읽어 FAISS 벡터 인덱스를 구축합니다.
+    (소규모 코퍼스는 인메모리 FAISS가 쿼리당 sqlite 오버헤드 없이 더 빠릅니다.)
     """
-    knowledge_base_path = "./data/knowledge_base"
-    persist_directory = settings.CHROMA_DB_PATH # settings에서 ChromaDB 경로 가져옴
+    knowledge_base_path = settings.KNOWLEDGE_BASE_PATH
+    index_path = settings.FAISS_INDEX_PATH # settings에서 FAISS 인덱스 경로 가져옴
 
-    # ChromaDB 저장 디렉토리가 없으면 생성
-    os.makedirs(persist_directory, exist_ok=True)
-    logger.info(f"Ensured ChromaDB persistence directory exists: {persist_directory}")
+    # 인덱스 저장 디렉토리가 없으면 생성
+    os.makedirs(index_path, exist_ok=True)
+    logger.info(f"Ensured FAISS index directory exists: {index_path}")
 
     if not os.path.exists(knowledge_base_path):
         logger.error(f"Knowledge base path not found: {knowledge_base_path}")
@@ -31,51 +133,51 @@ def build_rag_database():
         print("Please create the folder and place your psychology_corpus.txt file inside.")
         sys.exit(1) # 스크립트 종료
 
-    documents = []
     logger.info(f"Loading documents from {knowledge_base_path}...")
-    for filename in os.listdir(knowledge_base_path):
-        # 숨김 파일이나 시스템 파일 (예: .DS_Store) 제외
-        if filename.endswith(".txt") and not filename.startswith("."):
-            file_path = os.path.join(knowledge_base_path, filename)
-            logger.info(f"Attempting to load document: {file_path}")
-            try:
-                # encoding="utf-8"을 명시하여 인코딩 문제 방지
-                loader = TextLoader(file_path, encoding="utf-8")
-                documents.extend(loader.load())
-                logger.info(f"Successfully loaded {filename}.")
-            except Exception as e:
-                logger.error(f"Error loading {file_path}: {e}", exc_info=True)
-                print(f"Error loading {file_path}: {e}")
+    # 숨김 파일이나 시스템 파일 (예: .DS_Store) 제외
+    file_paths = sorted(
+        os.path.join(knowledge_base_path, filename)
+        for filename in os.listdir(knowledge_base_path)
+        if filename.endswith(".txt") and not filename.startswith(".")
+    )
+    # 파일 읽기를 스레드 풀에서 동시에 수행 (문서 수에 비례하던 로딩 시간 단축)
+    documents = _load_documents_concurrently(file_paths)
 
     if not documents:
-        logger.warning(f"No text documents found in {knowledge_base_path}. ChromaDB will not be built.")
-        print(f"Warning: No text documents found in {knowledge_base_path}. ChromaDB will not be built.")
+        logger.warning(f"No text documents found in {knowledge_base_path}. FAISS index will not be built.")
+        print(f"Warning: No text documents found in {knowledge_base_path}. FAISS index will not be built.")
         return
 
     logger.info(f"Splitting {len(documents)} documents into chunks with chunk_size={settings.RAG_CHUNK_SIZE}, chunk_overlap={settings.RAG_CHUNK_OVERLAP}...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=settings.RAG_CHUNK_SIZE,
-        chunk_overlap=settings.RAG_CHUNK_OVERLAP
-    )
-    chunks = text_splitter.split_documents(documents)
+    # 단일 패스 문단 패킹 스플리터 (초대형 문단만 재귀 스플리터에 위임)
+    chunks = _fast_split_documents(documents)
     logger.info(f"Created {len(chunks)} text chunks.")
 
     logger.info("Initializing OpenAI Embeddings...")
     # OpenAI API 키가 환경 변수로 설정되어 있어야 합니다.
     embeddings = OpenAIEmbeddings(openai_api_key=settings.OPENAI_API_KEY)
 
-    logger.info(f"Creating or loading ChromaDB vector store at {persist_directory}...")
-    # Chroma.from_documents는 문서를 임베딩하고 persist_directory에 저장합니다.
-    # 만약 해당 디렉토리에 기존 DB가 있다면 로드하고, 없다면 새로 생성합니다.
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
+    # 래퍼(from_documents)의 소규모 순차 임베딩 대신, 최대 배치로 묶어
+    # 병렬 호출한 뒤 완성된 벡터를 from_embeddings로 바로 넘깁니다.
+    # 모델명은 검색 시 사용할 래퍼와 동일하게 맞춰 인덱스 호환성을 보장합니다.
+    texts = [chunk.page_content for chunk in chunks]
+    metadatas = [chunk.metadata for chunk in chunks]
+    logger.info(f"Embedding {len(texts)} chunks in parallel batches of {_EMBED_BATCH_SIZE}...")
+    vectors = asyncio.run(_embed_texts_in_batches(texts, embeddings.model))
+
+    logger.info(f"Building FAISS vector index at {index_path}...")
+    # 수천 청크 규모에서는 기본 IndexFlat 인덱스가 서브밀리초 top-k를 제공합니다.
+    # (코퍼스가 5만 청크를 넘는다면 IndexHNSWFlat으로의 전환을 검토하세요.)
+    # normalize_L2로 벡터를 정규화하여 내적이 코사인 유사도와 동치가 되게 합니다.
+    vectorstore = FAISS.from_embeddings(
+        text_embeddings=list(zip(texts, vectors)),
         embedding=embeddings,
-        persist_directory=persist_directory
+        metadatas=metadatas,
+        normalize_L2=True
     )
-    # from_documents를 사용하면 내부적으로 persist()가 호출될 수 있지만, 명시적으로 호출하는 것이 안전합니다.
-    vectorstore.persist()
-    logger.info("ChromaDB vector store built successfully!")
-    print(f"\nChromaDB vector store successfully built at {os.path.abspath(persist_directory)}\n")
+    vectorstore.save_local(index_path)
+    logger.info("FAISS vector index built successfully!")
+    print(f"\nFAISS vector index successfully built at {os.path.abspath(index_path)}\n")
 
 if __name__ == "__main__":
     # 스크립트 실행 전에 OPENAI_API_KEY가 환경 변수로 설정되어 있어야 합니다.
@@ -0,0 +1,239 @@
+# my_dream_project/tests/conftest.py
+# test_api.py와 test_piplines.py가 공유하는 fixture 모음입니다.
+# AsyncMock(spec=...)의 스펙 인트로스펙션과 DB/클라이언트 구성을 세션당
+# 한 번만 수행하고, 테스트 간 상태 격리는 함수 스코프의 autouse fixture
+# (Mock reset, SAVEPOINT 롤백)가 담당합니다.
+import pytest
+import pytest_asyncio # 비동기 fixture 정의용 (scope/loop_scope 지정)
+from asgi_lifespan import LifespanManager # 앱 lifespan을 세션당 한 번만 실행
+from httpx import ASGITransport, AsyncClient # 비동기 테스트 클라이언트 (ASGI 앱 직접 호출)
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event # 연결 시 PRAGMA 적용 훅
+from sqlalchemy.pool import StaticPool # 인메모리 DB 수명 유지를 위한 단일 연결 풀
+from typing import AsyncGenerator, Any
+from unittest.mock import AsyncMock, MagicMock # 외부 API 서비스 Mocking용
+
+from app.main import app
+from app.core.dependencies import get_dream_pipeline # 오버라이드할 파이프라인 의존성 함수
+from app.database.connection import Base # ORM Base 클래스 (테이블 생성을 위해 필요)
+from app.database.session import get_db # 오버라이드할 DB 의존성 함수
+from app.piplines.dream_pipeline import DreamPipeline
+import app.api.dream_routes as dream_routes # 백그라운드 작업의 세션 팩토리 교체용
+
+# ----------------------------------------------------
+# Mock 반환값 상수
+# 매 테스트마다 동일한 딕셔너리를 다시 만들지 않도록 한 번만 정의하고,
+# fixture와 assert 양쪽에서 참조합니다. (반환값 검증은 깊은 비교 대신
+# O(1) 동일성(is) 검사로 끝낼 수 있습니다.)
+# API 테스트 경로에서 JSON 컬럼에 그대로 저장되므로 직렬화 가능한
+# 평범한 dict여야 합니다 — 테스트에서 변형하지 마세요.
+# ----------------------------------------------------
+STT_TEXT = "나는 하늘을 나는 꿈을 꾸었다. 매우 즐거웠다."
+ANALYSIS_RESULT = {
+    "summary": "하늘을 나는 즐거운 꿈",
+    "keywords": ["하늘", "비행", "즐거움"],
+    "symbolism_analysis": "자유와 성취감을 나타냅니다.",
+    "emotional_context": "매우 긍정적입니다.",
+    "potential_implications": "현실에서의 자유로운 삶을 추구할 수 있습니다.",
+    "image_prompt_original": "A person joyfully flying in a surreal blue sky.",
+    "image_prompt_healing": "A peaceful landscape with a gentle breeze and sun."
+}
+IRT_RESULT = {
+    "irt_explanation": "IRT는 꿈 이미지를 재구성하는 치료입니다.",
+    "negative_elements_identified": [], # 이 테스트에서는 부정적 요소가 없다고 가정
+    "rescripting_suggestions": [], # 이 테스트에서는 재구성 제안이 없다고 가정
+    "actionable_insights": "꿈의 긍정적인 면을 강화하세요."
+}
+IMAGE_URLS = {
+    "A person joyfully flying in a surreal blue sky.": "http://example.com/generated_image.png",
+    "A peaceful landscape with a gentle breeze and sun.": "http://example.com/healing_image.png",
+}
+
+# ----------------------------------------------------
+# 테스트 환경을 위한 데이터베이스 설정
+# ----------------------------------------------------
+# 테스트용 공유 캐시 인메모리 SQLite DB URL.
+# 파일 기반 DB는 셋업/요청마다 fsync와 페이지 캐시 I/O 비용을 내지만,
+# mode=memory&cache=shared는 프로세스 내 모든 연결이 디스크 없이 하나의
+# 인메모리 DB를 공유하므로 테스트 간 데이터도 보이고 test.db 파일도 남지 않습니다.
+TEST_DATABASE_URL = "sqlite+aiosqlite:///file:test?mode=memory&cache=shared&uri=true"
+
+# 테스트용 DB 엔진 생성
+# echo=False로 설정하여 테스트 시 SQL 쿼리 출력을 비활성화합니다.
+# 인메모리 DB는 마지막 연결이 닫히는 순간 사라지므로, StaticPool로 연결
+# 하나를 세션 내내 붙잡아 DB 수명을 테스트 세션과 일치시킵니다.
+test_engine = create_async_engine(TEST_DATABASE_URL, echo=False, poolclass=StaticPool)
+
+# 인메모리 DB라도 기본값(synchronous=FULL, 저널 준비, 잠금 협상)의 비용을 냅니다.
+# 테스트 DB는 내구성이 필요 없으므로 연결 시점에 속도 위주 PRAGMA를 적용하여
+# 쓰기가 많은 세션 생성 테스트의 트랜잭션당 오버헤드를 제거합니다.
+@event.listens_for(test_engine.sync_engine, "connect")
+def _set_sqlite_speed_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+# ----------------------------------------------------
+# pytest Fixture: 테스트 시작/종료 시 DB 초기화
+# 이벤트 루프는 pyproject.toml의 asyncio_default_*_loop_scope = "session"
+# 설정으로 세션 전체가 하나를 공유하므로, 세션 스코프 fixture가 만든
+# 연결/클라이언트를 모든 테스트에서 그대로 쓸 수 있습니다.
+# ----------------------------------------------------
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def setup_db():
+    """
+    테스트 세션 시작 전 (setup): 테스트용 DB에 모든 테이블을 생성합니다.
+    (스키마 생성은 세션당 한 번이면 충분합니다 — 테스트 간 데이터 격리는
+    아래 db_session fixture의 SAVEPOINT 롤백이 담당합니다.)
+    """
+    # 프로세스마다 새 인메모리 DB로 시작하므로 사전 drop_all은 DROP TABLE
+    # IF EXISTS 왕복만 더할 뿐입니다 — 스키마 DDL 전체를 동기 콜러블 하나로
+    # 묶어 단일 트랜잭션/단일 run_sync 왕복으로 수행합니다.
+    def _init_schema(sync_conn):
+        Base.metadata.create_all(sync_conn)
+
+    async with test_engine.begin() as conn:
+        await conn.run_sync(_init_schema)
+    yield # 이 시점에서 테스트 함수들이 실행됩니다.
+    # 인메모리 DB는 프로세스 종료와 함께 사라지므로 별도 정리가 필요 없습니다.
+
+
+# ----------------------------------------------------
+# FastAPI 의존성 오버라이드: get_db
+# 각 테스트를 외부 트랜잭션 안의 SAVEPOINT에서 실행하고 테스트가 끝나면
+# 통째로 롤백하는 "join an external transaction" 패턴입니다.
+# 핸들러가 호출하는 commit()은 join_transaction_mode="create_savepoint"
+# 덕분에 SAVEPOINT만 해제/재시작하므로, 테스트가 쓴 행이 다음 테스트로
+# 새어 나가지 않아 id 충돌 없이 순서 독립적으로 실행됩니다.
+# ----------------------------------------------------
+@pytest_asyncio.fixture(autouse=True)
+async def db_session(setup_db) -> AsyncGenerator[AsyncSession, Any]:
+    """
+    테스트마다 외부 트랜잭션에 묶인 세션 팩토리를 get_db 오버라이드와
+    백그라운드 작업 경로(dream_routes.AsyncSessionLocal)에 주입하고,
+    테스트 종료 시 외부 트랜잭션을 롤백하여 DB 상태를 되돌립니다.
+    요청/작업마다 새 세션을 만들어 아이덴티티 맵이 요청 간에 낡은 행을
+    돌려주는 일을 막되, 모두 같은 연결의 SAVEPOINT에 참여시킵니다.
+    """
+    conn = await test_engine.connect()
+    trans = await conn.begin()
+    bound_session_factory = async_sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=conn,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint"
+    )
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, Any]:
+        async with bound_session_factory() as session:
+            yield session # 요청마다 새 세션 (같은 외부 트랜잭션에 SAVEPOINT로 참여)
+
+    app.dependency_overrides[get_db] = override_get_db
+    # 202 접수 후 실행되는 백그라운드 작업도 앱 DB 대신 같은 트랜잭션에 쓰도록 교체합니다.
+    # (교체하지 않으면 결과가 실제 앱 DB에 저장되어 폴링 GET이 보지 못합니다.)
+    original_factory = dream_routes.AsyncSessionLocal
+    dream_routes.AsyncSessionLocal = bound_session_factory
+    session = bound_session_factory()
+    try:
+        yield session
+    finally:
+        await session.close()
+        dream_routes.AsyncSessionLocal = original_factory
+        await trans.rollback() # 테스트가 commit한 내용까지 전부 되돌림
+        await conn.close()
+
+
+# ----------------------------------------------------
+# 앱 lifespan을 세션당 한 번만 실행하는 fixture
+# httpx의 ASGITransport는 lifespan을 아예 실행하지 않으므로, LifespanManager로
+# startup 핸들러(DB 테이블 생성, 파이프라인/토크나이저 워밍업)를 세션 시작 시
+# 정확히 한 번 돌리고 종료 시 shutdown을 실행합니다. 테스트 수가 늘어도
+# 워밍업 비용은 고정입니다.
+# ----------------------------------------------------
+@pytest_asyncio.fixture(scope="session")
+async def lifespan_app():
+    """startup/shutdown이 한 번만 실행된 앱을 제공합니다."""
+    async with LifespanManager(app) as manager:
+        yield manager.app
+
+# ----------------------------------------------------
+# 공유 테스트 클라이언트
+# 테스트마다 AsyncClient를 새로 만들면 ASGI 전송 계층 구성이 반복되므로,
+# 세션 스코프로 하나만 만들어 모든 테스트가 같은 클라이언트(와 연결)를
+# 재사용합니다.
+# ----------------------------------------------------
+@pytest_asyncio.fixture(scope="session")
+async def client(lifespan_app) -> AsyncGenerator[AsyncClient, Any]:
+    """전체 테스트 세션이 공유하는 ASGI 테스트 클라이언트입니다."""
+    async with AsyncClient(transport=ASGITransport(app=lifespan_app), base_url="http://test") as c:
+        yield c
+
+
+# ----------------------------------------------------
+# Mock 서비스 Fixtures
+# 실제 API 호출(Whisper/GPT-4o/DALL-E)을 Mocking하여 테스트가 네트워크 없이
+# 결정적으로 실행되게 합니다. AsyncMock(spec=...)은 생성 시 spec 클래스의
+# dir() 전체를 인트로스펙션하는데, 테스트가 건드리는 메서드는 한두 개뿐이라
+# spec 없이 만들고 필요한 메서드만 명시적으로 둡니다. (어느 테스트도 미지의
+# 속성 접근에 대한 AttributeError에 의존하지 않습니다.)
+# ----------------------------------------------------
+@pytest.fixture(scope="session")
+def mock_audio_service():
+    """AudioService Mock 객체를 제공합니다. (기본 반환값은 _reset_service_mocks가 적용)"""
+    return AsyncMock()
+
+@pytest.fixture(scope="session")
+def mock_analysis_service():
+    """AnalysisService Mock 객체를 제공합니다."""
+    service = AsyncMock()
+    # prefetch_context는 실제 서비스에서 동기 메서드이고 create_session 경로가
+    # 직접 호출합니다. AsyncMock 자동 자식이면 await되지 않은 코루틴 경고가
+    # 나므로 동기 Mock으로 고정합니다.
+    service.prefetch_context = MagicMock()
+    service.start_context_retrieval = MagicMock()
+    return service
+
+@pytest.fixture(scope="session")
+def mock_image_service():
+    """ImageService Mock 객체를 제공합니다."""
+    return AsyncMock()
+
+@pytest.fixture(scope="session")
+def dream_pipeline(mock_audio_service, mock_analysis_service, mock_image_service):
+    """
+    Mock 서비스 객체들로 초기화된 DreamPipeline 인스턴스를 제공하는 fixture입니다.
+    (파이프라인 단위 테스트와 API 테스트의 의존성 오버라이드가 함께 사용합니다.)
+    """
+    return DreamPipeline(
+        audio_service=mock_audio_service,
+        analysis_service=mock_analysis_service,
+        image_service=mock_image_service
+    )
+
+@pytest.fixture(autouse=True)
+def _reset_service_mocks(mock_audio_service, mock_analysis_service, mock_image_service, dream_pipeline):
+    """
+    세션 스코프 Mock들을 테스트마다 기본 상태로 되돌리고, API 테스트가
+    Mock 파이프라인을 쓰도록 의존성 오버라이드를 적용합니다.
+    테스트 시작 전에 호출 기록/side_effect를 지우고 기본 반환값을 다시
+    적용하므로, 개별 테스트가 설정한 side_effect가 다음 테스트로 새지 않습니다.
+    """
+    for mock in (mock_audio_service, mock_analysis_service, mock_image_service):
+        mock.reset_mock(return_value=True, side_effect=True)
+    mock_audio_service.speech_to_text.return_value = STT_TEXT
+    mock_analysis_service.analyze_dream.return_value = ANALYSIS_RESULT
+    mock_analysis_service.perform_irt.return_value = IRT_RESULT
+    mock_image_service.generate_image.side_effect = (
+        lambda prompt: IMAGE_URLS.get(prompt, "http://example.com/generated_image.png")
+    )
+    async def override_get_dream_pipeline():
+        # 동기 콜러블 오버라이드는 threadpool로 우회 실행되므로 async로 유지합니다.
+        return dream_pipeline
+
+    app.dependency_overrides[get_dream_pipeline] = override_get_dream_pipeline
+    yield
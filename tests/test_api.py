@@ -1,205 +1,245 @@
 # my_dream_project/tests/test_api.py
+# DB 엔진/세션, 공유 클라이언트, Mock 서비스 fixture들은 conftest.py에
+# 있습니다. 이 파일은 API 엔드포인트 테스트만 담습니다.
+import json # SSE 이벤트 파싱용
 import pytest
-from httpx import AsyncClient # 비동기 테스트 클라이언트
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import sessionmaker # 최신 버전에서는 async_sessionmaker를 더 선호
-from sqlalchemy import text # SQL 쿼리 테스트용 (여기서는 직접 사용되지 않음)
-from typing import AsyncGenerator, Any # AsyncGenerator와 Any 임포트 추가
-
-# 테스트를 위한 애플리케이션 임포트
-from app.main import app
-from app.core.settings import settings # 설정 정보 로드
-from app.database.connection import Base # ORM Base 클래스 (테이블 생성을 위해 필요)
-from app.database.session import get_db # 오버라이드할 DB 의존성 함수
+import pytest_asyncio # created_session fixture 정의용
+from unittest.mock import MagicMock # analyze_dream_stream을 async generator로 교체할 때 사용
 
-# ----------------------------------------------------
-# 테스트 환경을 위한 데이터베이스 설정
-# ----------------------------------------------------
-# 테스트용 SQLite 파일 기반 DB URL (디버깅 시 확인 용이)
-# ":memory:"를 사용하면 테스트 종료 시 DB가 완전히 사라집니다.
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
-
-# 테스트용 DB 엔진 생성
-# echo=False로 설정하여 테스트 시 SQL 쿼리 출력을 비활성화합니다.
-test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-TestingSessionLocal = async_sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=test_engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
+from conftest import ANALYSIS_RESULT, IMAGE_URLS
+from app.utils.exceptions import AIModelException
 
 # ----------------------------------------------------
-# pytest Fixture: 테스트 시작/종료 시 DB 초기화
+# 업로드 페이로드 상수
+# 요청마다 files 딕셔너리/튜플을 다시 만들지 않도록 모듈 레벨에서 한 번만
+# 구성합니다. bytes는 불변이라 여러 요청에 안전하게 재사용됩니다.
+# (STT는 Mock이라 내용과 무관하게 같은 텍스트를 반환합니다.)
 # ----------------------------------------------------
-@pytest.fixture(scope="session", autouse=True)
-async def setup_db():
-    """
-    테스트 세션 시작 전 (setup): 테스트용 DB의 모든 테이블을 삭제하고 다시 생성합니다.
-    테스트 세션 종료 후 (teardown): 모든 테이블을 다시 삭제하여 깨끗한 상태를 유지합니다.
-    """
-    # 테스트 시작 전 기존 테이블 삭제 및 재생성
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all) # 기존 테이블 모두 삭제
-        await conn.run_sync(Base.metadata.create_all) # 모든 테이블 새로 생성
-    yield # 이 시점에서 테스트 함수들이 실행됩니다.
-    # 테스트 세션 종료 후 정리
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all) # 테스트 종료 후 테이블 다시 삭제
+_AUDIO_BYTES = b"User's dream about flying and falling."
+_AUDIO_FILES = {"audio_file": ("dream.wav", _AUDIO_BYTES, "audio/wav")}
+_SIMPLE_AUDIO_FILES = {"audio_file": ("simple.wav", b"Simple dream text for IRT test.", "audio/wav")}
 
 
 # ----------------------------------------------------
-# FastAPI 의존성 오버라이드: get_db
+# 세션 생성 공용 fixture
+# 세션 생성(STT 포함)이 필요한 테스트들이 같은 생성 코드를 반복하지 않도록
+# 한 곳으로 모읍니다. db_session의 SAVEPOINT 롤백이 테스트마다 DB를
+# 되돌리므로 행 자체는 공유할 수 없고, 함수 스코프로 테스트당 한 번 생성합니다.
 # ----------------------------------------------------
-# main.py에서 사용되는 get_db 의존성 함수를 테스트용으로 교체합니다.
-# 이렇게 하면 API 호출 시 테스트용 DB 세션이 사용됩니다.
-async def override_get_db() -> AsyncGenerator[AsyncSession, Any]: # <<-- 이 줄이 수정되었습니다.
-    """
-    테스트용 데이터베이스 세션을 제공하는 함수입니다.
-    """
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        await db.close()
-
-# FastAPI 앱의 get_db 의존성을 테스트용 override_get_db 함수로 교체합니다.
-# 이는 테스트 클라이언트를 통해 앱을 호출할 때 적용됩니다.
-app.dependency_overrides[get_db] = override_get_db
+@pytest_asyncio.fixture
+async def created_session(client):
+    """POST /api/sessions로 세션을 하나 만들고 (session_id, dream_text)를 반환합니다."""
+    response = await client.post("/api/sessions", files=_AUDIO_FILES)
+    assert response.status_code == 201 # HTTP 201 Created
+    payload = response.json()
+    assert "id" in payload # 'session_id' 대신 'id'로 변경됨 (dream_model.py에 맞춤)
+    assert "dream_text" in payload
+    return payload["id"], payload["dream_text"]
 
 # ----------------------------------------------------
 # API 엔드포인트 테스트 케이스들
 # ----------------------------------------------------
 
 @pytest.mark.asyncio
-async def test_root_endpoint():
+async def test_root_endpoint(client):
     """
     루트 엔드포인트("/")가 정상적으로 응답하는지 테스트합니다.
     """
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        response = await ac.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
     assert "Welcome to My Dream Project API!" in response.json()["message"]
 
 
 @pytest.mark.asyncio
-async def test_create_dream_session():
+async def test_create_dream_session(client, created_session):
     """
     새로운 꿈 분석 세션 생성 API (`/api/sessions`)를 테스트합니다.
     음성 파일을 보내면 텍스트로 변환되고 세션이 DB에 저장되는지 확인합니다.
+    (생성과 201/필드 검증은 created_session fixture가 수행합니다.)
     """
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        # 테스트용 오디오 파일 바이트 데이터 (실제 Whisper API 호출은 Mocking 필요)
-        # 여기서는 STT 서비스가 "dummy audio content simulating a WAV file."를 반환한다고 가정합니다.
-        audio_content = b"This is a dummy audio content simulating a WAV file."
-        # FastAPI의 UploadFile 형식을 모방하여 files 딕셔너리 구성
-        files = {"audio_file": ("test_audio.wav", audio_content, "audio/wav")}
-
-        response = await ac.post("/api/sessions", files=files)
+    session_id, dream_text = created_session
 
-    assert response.status_code == 201 # HTTP 201 Created
-    assert "id" in response.json() # 'session_id' 대신 'id'로 변경됨 (dream_model.py에 맞춤)
-    assert "dream_text" in response.json()
-    # Mocking 없이 실제 STT 서비스가 호출된다면, 이 assert는 실제 Whisper 변환 결과에 따라 변경되어야 합니다.
-    # test_pipelines.py에서와 같이 audio_service를 Mocking하는 것이 더 일반적인 방법입니다.
-    # 현재는 더미 데이터를 보냈을 때 STT 서비스가 해당 더미 내용을 텍스트로 반환한다고 가정
-    assert response.json()["dream_text"] == "This is a dummy audio content simulating a WAV file."
-
-    # 생성된 세션 ID로 세션 조회 테스트
-    session_id = response.json()["id"]
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        get_response = await ac.get(f"/api/sessions/{session_id}")
+    # 생성된 세션 ID로 세션 조회 테스트 (같은 클라이언트로 연결 재사용)
+    get_response = await client.get(f"/api/sessions/{session_id}")
     assert get_response.status_code == 200
     assert get_response.json()["id"] == session_id
-    assert get_response.json()["dream_text"] == response.json()["dream_text"]
+    assert get_response.json()["dream_text"] == dream_text
 
 
 @pytest.mark.asyncio
-async def test_analyze_dream_and_generate_image():
+async def test_analyze_dream_and_generate_image(client, created_session):
     """
     꿈 분석 및 이미지 생성 API (`/api/sessions/{session_id}/analyze`)를 테스트합니다.
     세션 생성 후 분석 요청 시, 분석 결과와 이미지 URL이 반환되는지 확인합니다.
     """
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        # 1. 먼저 테스트용 세션을 생성합니다. (STT 결과가 있어야 분석 가능)
-        # 실제 audio_service, analysis_service, image_service는 Mocking되어야 합니다.
-        # 여기서는 STT가 "User's dream about flying and falling."을 반환한다고 가정
-        audio_content = b"User's dream about flying and falling."
-        files = {"audio_file": ("dream.wav", audio_content, "audio/wav")}
-        create_session_response = await ac.post("/api/sessions", files=files)
-        assert create_session_response.status_code == 201
-        session_id = create_session_response.json()["id"]
-
-        # 2. 생성된 세션 ID로 꿈 분석 요청
-        response = await ac.post(f"/api/sessions/{session_id}/analyze")
+    # 1. 테스트용 세션은 created_session fixture가 생성합니다.
+    session_id, _ = created_session
 
-    assert response.status_code == 200
+    # 2. 생성된 세션 ID로 꿈 분석 요청 (202 접수 후 폴링 방식)
+    response = await client.post(f"/api/sessions/{session_id}/analyze")
+    assert response.status_code == 202
     assert response.json()["session_id"] == session_id
-    assert "analysis_results" in response.json()
-    assert "generated_image_url" in response.json()
-    assert "healing_image_url" in response.json()
+    assert response.json()["poll_url"] == f"/api/sessions/{session_id}"
+
+    # 3. 백그라운드 작업 완료 후 폴링 URL로 결과 확인
+    poll_response = await client.get(response.json()["poll_url"])
+
+    assert poll_response.status_code == 200
+    assert poll_response.json()["status"] == "done"
+    assert "analysis_results" in poll_response.json()
 
     # 분석 결과 내용 검증 (mocking된 analysis_service의 반환 값과 일치해야 함)
-    assert "summary" in response.json()["analysis_results"]
-    assert "keywords" in response.json()["analysis_results"]
-    assert "http" in response.json()["generated_image_url"] # URL 형식인지 간단 확인 (http 또는 https 포함)
+    assert "summary" in poll_response.json()["analysis_results"]
+    assert "keywords" in poll_response.json()["analysis_results"]
+    # 생성된 이미지 URL 목록 확인 (http 또는 https 포함)
+    assert "http" in poll_response.json()["generated_images"][-1]["original"]
 
 
 @pytest.mark.asyncio
-async def test_perform_irt_analysis():
+async def test_perform_irt_analysis(client, created_session):
     """
     IRT 분석 API (`/api/sessions/{session_id}/irt`)를 테스트합니다.
     분석 결과가 있는 세션에 대해 IRT 요청 시, IRT 결과가 반환되는지 확인합니다.
     """
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        # 1. 테스트용 세션 생성
-        audio_content = b"I dreamed of being chased by a monster."
-        files = {"audio_file": ("monster_dream.wav", audio_content, "audio/wav")}
-        create_session_response = await ac.post("/api/sessions", files=files)
-        assert create_session_response.status_code == 201
-        session_id = create_session_response.json()["id"]
+    # 1. 테스트용 세션은 created_session fixture가 생성합니다.
+    session_id, _ = created_session
+
+    # 2. 꿈 분석 (IRT 수행 전 분석 결과가 필수, 202 접수 후 백그라운드 완료 대기)
+    analyze_response = await client.post(f"/api/sessions/{session_id}/analyze")
+    assert analyze_response.status_code == 202
+
+    # 3. IRT 분석 요청 (202 접수 후 폴링으로 결과 확인)
+    response = await client.post(f"/api/sessions/{session_id}/irt")
+    assert response.status_code == 202
+    assert response.json()["session_id"] == session_id
+
+    poll_response = await client.get(response.json()["poll_url"])
+
+    assert poll_response.status_code == 200
+    assert poll_response.json()["status"] == "done"
+    assert "irt_results" in poll_response.json()
+    assert "irt_explanation" in poll_response.json()["irt_results"]
+    assert "rescripting_suggestions" in poll_response.json()["irt_results"]
+
+
+def _parse_sse_events(body: str):
+    """`data: {...}` 형식의 SSE 본문을 이벤트 dict 리스트로 변환합니다."""
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_analyze_dream_streaming(client, mock_audio_service, mock_analysis_service, mock_image_service):
+    """
+    SSE 스트리밍 분석 API (`/api/sessions/{session_id}/analyze/stream`)를 테스트합니다.
+    부분 분석 이벤트 → 최종 result → done 순서로 이벤트가 내려오고,
+    결과가 `/analyze`와 동일하게 DB에 저장되는지 확인합니다.
+    두 번째 partial에서 image_prompt_original이 완성되므로 STAGE 3 이미지 생성이
+    스트림 도중에 조기 시작되어 원본 프롬프트가 먼저 호출되어야 합니다.
+    """
+    # 다른 테스트들이 STT_TEXT로 파이프라인 모듈 캐시를 채워 두므로,
+    # 캐시 적중 경로가 아닌 실제 스트리밍 경로를 타도록 고유한 텍스트를 씁니다.
+    mock_audio_service.speech_to_text.return_value = "스트리밍 테스트용 유일한 꿈 텍스트."
+    create_response = await client.post("/api/sessions", files=_AUDIO_FILES)
+    assert create_response.status_code == 201
+    session_id = create_response.json()["id"]
+
+    async def _fake_analysis_stream(dream_text):
+        # GPT-4o의 부분 JSON 파싱 결과처럼 필드가 점진적으로 채워지는 스트림을 흉내냅니다.
+        yield {"summary": ANALYSIS_RESULT["summary"]}
+        yield {
+            "summary": ANALYSIS_RESULT["summary"],
+            "image_prompt_original": ANALYSIS_RESULT["image_prompt_original"],
+            "image_prompt_healing": "", # 키 등장 = original 프롬프트 완성 → 조기 생성 시작 조건
+        }
+        yield dict(ANALYSIS_RESULT)
+
+    # async generator 함수는 AsyncMock의 기본 코루틴 반환과 맞지 않으므로
+    # side_effect로 직접 연결합니다. (autouse reset fixture가 테스트 후 정리)
+    mock_analysis_service.analyze_dream_stream = MagicMock(side_effect=_fake_analysis_stream)
+
+    response = await client.post(f"/api/sessions/{session_id}/analyze/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse_events(response.text)
+    # 이벤트 순서: analysis(부분 결과 3개) → result → done
+    assert [e["type"] for e in events] == ["analysis", "analysis", "analysis", "result", "done"]
+    assert events[0]["data"] == {"summary": ANALYSIS_RESULT["summary"]}
+    result_data = events[-2]["data"]
+    assert result_data["analysis_results"] == ANALYSIS_RESULT
+    assert result_data["original_image_url"] == IMAGE_URLS[ANALYSIS_RESULT["image_prompt_original"]]
+    assert result_data["healing_image_url"] == IMAGE_URLS[ANALYSIS_RESULT["image_prompt_healing"]]
+
+    # 조기 시작 휴리스틱: original 이미지 생성이 healing보다 먼저 호출됩니다.
+    called_prompts = [c.args[0] for c in mock_image_service.generate_image.call_args_list]
+    assert called_prompts == [ANALYSIS_RESULT["image_prompt_original"], ANALYSIS_RESULT["image_prompt_healing"]]
+
+    # 스트림 종료 후 결과가 DB에 저장되어 폴링 경로와 호환되는지 확인합니다.
+    poll_response = await client.get(f"/api/sessions/{session_id}")
+    assert poll_response.status_code == 200
+    assert poll_response.json()["status"] == "done"
+    assert poll_response.json()["analysis_results"] == ANALYSIS_RESULT
+    assert "http" in poll_response.json()["generated_images"][-1]["original"]
+
+
+@pytest.mark.asyncio
+async def test_analyze_dream_streaming_error(client, mock_audio_service, mock_analysis_service):
+    """
+    스트리밍 분석 도중 파이프라인이 실패하면 (상태 코드는 이미 200으로 전송된 뒤이므로)
+    error 이벤트로 알리고 세션 상태를 error로 표시하는지 테스트합니다.
+    """
+    mock_audio_service.speech_to_text.return_value = "스트리밍 실패 테스트용 유일한 꿈 텍스트."
+    create_response = await client.post("/api/sessions", files=_AUDIO_FILES)
+    assert create_response.status_code == 201
+    session_id = create_response.json()["id"]
 
-        # 2. 꿈 분석 (IRT 수행 전 분석 결과가 필수)
-        analyze_response = await ac.post(f"/api/sessions/{session_id}/analyze")
-        assert analyze_response.status_code == 200
+    async def _failing_analysis_stream(dream_text):
+        yield {"summary": "부분 결과"}
+        raise AIModelException("Streaming analysis blew up")
 
-        # 3. IRT 분석 요청
-        response = await ac.post(f"/api/sessions/{session_id}/irt")
+    mock_analysis_service.analyze_dream_stream = MagicMock(side_effect=_failing_analysis_stream)
 
+    response = await client.post(f"/api/sessions/{session_id}/analyze/stream")
     assert response.status_code == 200
-    assert response.json()["session_id"] == session_id
-    assert "irt_results" in response.json()
-    assert "irt_explanation" in response.json()["irt_results"]
-    assert "rescripting_suggestions" in response.json()["irt_results"]
+
+    events = _parse_sse_events(response.text)
+    # 첫 partial은 정상 전송되고, 실패 시점에 error 이벤트로 종료됩니다.
+    assert [e["type"] for e in events] == ["analysis", "error"]
+    assert "Streaming analysis blew up" in events[-1]["detail"]
+
+    # 실패한 세션은 폴링 시 error 상태로 보여야 합니다.
+    poll_response = await client.get(f"/api/sessions/{session_id}")
+    assert poll_response.status_code == 200
+    assert poll_response.json()["status"] == "error"
+    assert poll_response.json()["analysis_results"] is None
 
 
 @pytest.mark.asyncio
-async def test_get_non_existent_session():
+async def test_get_non_existent_session(client):
     """
     존재하지 않는 세션 ID로 조회 시 404 Not Found 응답이 오는지 테스트합니다.
     """
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        response = await ac.get("/api/sessions/99999") # 존재하지 않을 것으로 예상되는 ID
+    response = await client.get("/api/sessions/99999") # 존재하지 않을 것으로 예상되는 ID
     assert response.status_code == 404
     assert "Session with ID 99999 not found." in response.json()["detail"]
 
 
 @pytest.mark.asyncio
-async def test_irt_without_analysis():
+async def test_irt_without_analysis(client):
     """
     분석 없이 IRT를 요청했을 때 400 Bad Request 응답이 오는지 테스트합니다.
     """
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        # 세션만 생성하고 analyze 단계는 건너뜁니다.
-        audio_content = b"Simple dream text for IRT test."
-        files = {"audio_file": ("simple.wav", audio_content, "audio/wav")}
-        create_session_response = await ac.post("/api/sessions", files=files)
-        assert create_session_response.status_code == 201
-        session_id = create_session_response.json()["id"]
+    # 세션만 생성하고 analyze 단계는 건너뜁니다.
+    create_session_response = await client.post("/api/sessions", files=_SIMPLE_AUDIO_FILES)
+    assert create_session_response.status_code == 201
+    session_id = create_session_response.json()["id"]
 
-        # IRT 분석 요청
-        response = await ac.post(f"/api/sessions/{session_id}/irt")
+    # IRT 분석 요청
+    response = await client.post(f"/api/sessions/{session_id}/irt")
     assert response.status_code == 400
     assert "Analysis must be performed for session" in response.json()["detail"]
     assert "before IRT." in response.json()["detail"]
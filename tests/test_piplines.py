@@ -1,74 +1,18 @@
 # my_dream_project/tests/test_pipelines.py
+# Mock 서비스/파이프라인 fixture와 반환값 상수는 conftest.py에 있습니다.
+# (test_api.py의 의존성 오버라이드와 동일한 Mock을 공유합니다.)
 import pytest
-from unittest.mock import AsyncMock, MagicMock # 비동기 함수를 Mocking하기 위해 AsyncMock 사용
-from app.piplines.dream_pipeline import DreamPipeline
-from app.services.audio_service import AudioService
-from app.services.analysis_service import AnalysisService
-from app.services.image_service import ImageService
-from app.core.settings import settings # 설정 파일 임포트 (테스트에서 직접 사용될 일은 드뭄)
+from unittest.mock import call # 기대 호출을 모듈 레벨에서 한 번만 구성
+from conftest import ANALYSIS_RESULT, IRT_RESULT # 반환값 검증용 공유 상수
 from app.utils.exceptions import ServiceException # 파이프라인에서 발생할 수 있는 예외
 
 # ----------------------------------------------------
-# Mock 객체 Fixtures
-# 실제 API 호출을 Mocking하여 테스트의 안정성과 속도를 높입니다.
-# 실제 API 호출을 테스트하고 싶다면 (비용 및 속도 저하 감수) Mocking 부분을 제거하세요.
+# 기대 호출 상수
+# 긴 프롬프트 리터럴을 테스트마다 다시 만들지 않도록 call 객체로 한 번만
+# 구성해 두고, call_args_list와의 일괄 비교로 검증합니다.
 # ----------------------------------------------------
-
-@pytest.fixture
-def mock_audio_service():
-    """
-    AudioService Mock 객체를 제공합니다.
-    speech_to_text 메서드가 고정된 텍스트를 비동기적으로 반환하도록 설정합니다.
-    """
-    service = AsyncMock(spec=AudioService) # AudioService의 스펙을 따르는 AsyncMock 생성
-    service.speech_to_text.return_value = "나는 하늘을 나는 꿈을 꾸었다. 매우 즐거웠다."
-    return service
-
-@pytest.fixture
-def mock_analysis_service():
-    """
-    AnalysisService Mock 객체를 제공합니다.
-    analyze_dream과 perform_irt 메서드가 고정된 결과를 비동기적으로 반환하도록 설정합니다.
-    """
-    service = AsyncMock(spec=AnalysisService)
-    service.analyze_dream.return_value = {
-        "summary": "하늘을 나는 즐거운 꿈",
-        "keywords": ["하늘", "비행", "즐거움"],
-        "symbolism_analysis": "자유와 성취감을 나타냅니다.",
-        "emotional_context": "매우 긍정적입니다.",
-        "potential_implications": "현실에서의 자유로운 삶을 추구할 수 있습니다.",
-        "image_prompt_original": "A person joyfully flying in a surreal blue sky.",
-        "image_prompt_healing": "A peaceful landscape with a gentle breeze and sun."
-    }
-    service.perform_irt.return_value = {
-        "irt_explanation": "IRT는 꿈 이미지를 재구성하는 치료입니다.",
-        "negative_elements_identified": [], # 이 테스트에서는 부정적 요소가 없다고 가정
-        "rescripting_suggestions": [], # 이 테스트에서는 재구성 제안이 없다고 가정
-        "actionable_insights": "꿈의 긍정적인 면을 강화하세요."
-    }
-    return service
-
-@pytest.fixture
-def mock_image_service():
-    """
-    ImageService Mock 객체를 제공합니다.
-    generate_image와 generate_healing_image 메서드가 더미 URL을 비동기적으로 반환하도록 설정합니다.
-    """
-    service = AsyncMock(spec=ImageService)
-    service.generate_image.return_value = "http://example.com/generated_image.png"
-    service.generate_healing_image.return_value = "http://example.com/healing_image.png"
-    return service
-
-@pytest.fixture
-def dream_pipeline(mock_audio_service, mock_analysis_service, mock_image_service):
-    """
-    Mock 서비스 객체들로 초기화된 DreamPipeline 인스턴스를 제공하는 fixture입니다.
-    """
-    return DreamPipeline(
-        audio_service=mock_audio_service,
-        analysis_service=mock_analysis_service,
-        image_service=mock_image_service
-    )
+_ORIGINAL_IMAGE_CALL = call(ANALYSIS_RESULT["image_prompt_original"])
+_HEALING_IMAGE_CALL = call(ANALYSIS_RESULT["image_prompt_healing"])
 
 # ----------------------------------------------------
 # 파이프라인 스테이지별 테스트 케이스
@@ -87,22 +31,16 @@ async def test_run_analysis_and_image_stages_success(dream_pipeline, mock_analys
     # 1. Mock 서비스 메서드가 예상대로 호출되었는지 확인
     # analysis_service의 analyze_dream 메서드가 dream_text 인자로 한 번 호출되었는지 확인
     mock_analysis_service.analyze_dream.assert_called_once_with(dream_text)
-    # image_service의 generate_image 및 generate_healing_image 메서드가 각각 한 번 호출되었는지 확인
+    # image_service의 generate_image 메서드가 원본/치유 프롬프트로 각각 호출되었는지 확인
     # 이때 호출된 프롬프트는 mock_analysis_service에서 반환된 값과 일치해야 합니다.
-    mock_image_service.generate_image.assert_called_once_with("A person joyfully flying in a surreal blue sky.")
-    mock_image_service.generate_healing_image.assert_called_once_with("A peaceful, positive, hopeful, and healing interpretation of: A peaceful landscape with a gentle breeze and sun.")
-
-
-    # 2. 파이프라인이 올바른 값을 반환했는지 확인 (Mock 객체의 return_value와 비교)
-    assert analysis_results == {
-        "summary": "하늘을 나는 즐거운 꿈",
-        "keywords": ["하늘", "비행", "즐거움"],
-        "symbolism_analysis": "자유와 성취감을 나타냅니다.",
-        "emotional_context": "매우 긍정적입니다.",
-        "potential_implications": "현실에서의 자유로운 삶을 추구할 수 있습니다.",
-        "image_prompt_original": "A person joyfully flying in a surreal blue sky.",
-        "image_prompt_healing": "A peaceful landscape with a gentle breeze and sun."
-    }
+    # (치유 프롬프트는 STAGE 2가 생성한 것을 가공 없이 그대로 사용하며,
+    # 태스크 생성 순서가 원본 → 치유로 고정이라 호출 목록을 한 번에 비교합니다.)
+    assert mock_image_service.generate_image.call_args_list == [_ORIGINAL_IMAGE_CALL, _HEALING_IMAGE_CALL]
+
+
+    # 2. 파이프라인이 올바른 값을 반환했는지 확인
+    # Mock이 반환한 바로 그 객체가 가공 없이 전달되어야 하므로 동일성 비교로 충분합니다.
+    assert analysis_results is ANALYSIS_RESULT
     assert original_image_url == "http://example.com/generated_image.png"
     assert healing_image_url == "http://example.com/healing_image.png"
 
@@ -125,13 +63,9 @@ async def test_run_irt_stage_success(dream_pipeline, mock_analysis_service):
     # analysis_service의 perform_irt 메서드가 dream_text와 mock_analysis_results 인자로 한 번 호출되었는지 확인
     mock_analysis_service.perform_irt.assert_called_once_with(dream_text, mock_analysis_results)
 
-    # 2. 파이프라인이 올바른 값을 반환했는지 확인 (Mock 객체의 return_value와 비교)
-    assert irt_results == {
-        "irt_explanation": "IRT는 꿈 이미지를 재구성하는 치료입니다.",
-        "negative_elements_identified": [],
-        "rescripting_suggestions": [],
-        "actionable_insights": "꿈의 긍정적인 면을 강화하세요."
-    }
+    # 2. 파이프라인이 올바른 값을 반환했는지 확인
+    # Mock이 반환한 바로 그 객체가 가공 없이 전달되어야 하므로 동일성 비교로 충분합니다.
+    assert irt_results is IRT_RESULT
 
 # ----------------------------------------------------
 # 예외 처리 테스트 케이스
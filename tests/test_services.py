@@ -0,0 +1,63 @@
+# my_dream_project/tests/test_services.py
+# 서비스 계층 단위 테스트.
+# API 테스트는 speech_to_text 자체를 Mock으로 대체하므로, 실제 AudioService가
+# 업로드 스트림을 Whisper API 호출 인자로 변환하는 경로는 여기서 검증합니다.
+import io
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.settings import settings
+from app.services.audio_service import AudioService
+
+_STT_TEXT = "변환된 꿈 텍스트입니다."
+
+
+def _stub_openai_client():
+    """audio.transcriptions.create만 흉내내는 OpenAI 클라이언트 스텁을 만듭니다."""
+    client = MagicMock()
+    client.audio.transcriptions.create = AsyncMock(return_value=SimpleNamespace(text=_STT_TEXT))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_speech_to_text_with_spooled_file():
+    """
+    create_dream_session이 넘기는 SpooledTemporaryFile 경로를 테스트합니다.
+    Python 3.11+에서 SpooledTemporaryFile.name은 읽기 전용 프로퍼티이므로
+    .name 할당 없이 (파일명, 스트림) 튜플로 SDK에 전달되어야 합니다.
+    """
+    client = _stub_openai_client()
+    service = AudioService(openai_client=client)
+
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spooled_audio:
+        spooled_audio.write(b"fake wav bytes")
+
+        result = await service.speech_to_text(spooled_audio, filename="dream.wav")
+
+        assert result == _STT_TEXT
+        kwargs = client.audio.transcriptions.create.call_args.kwargs
+        assert kwargs["model"] == settings.WHISPER_MODEL_NAME
+        filename, stream = kwargs["file"]
+        assert filename == "dream.wav"
+        assert stream is spooled_audio # 스트림은 복사 없이 그대로 전달
+        assert stream.tell() == 0 # 처음부터 읽도록 되감긴 상태
+
+
+@pytest.mark.asyncio
+async def test_speech_to_text_with_bytes():
+    """
+    bytes 입력 하위 호환 경로를 테스트합니다.
+    BytesIO로 감싸고 파일명을 name 속성으로 부여하여 전달해야 합니다.
+    """
+    client = _stub_openai_client()
+    service = AudioService(openai_client=client)
+
+    result = await service.speech_to_text(b"fake wav bytes", filename="dream.wav")
+
+    assert result == _STT_TEXT
+    audio_file = client.audio.transcriptions.create.call_args.kwargs["file"]
+    assert isinstance(audio_file, io.BytesIO)
+    assert audio_file.name == "dream.wav"